@@ -1,4 +1,5 @@
 import { connectToDatabase, COLLECTIONS } from "@/app/lib/mongo";
+import { formatsToLegalityMask } from "@/app/lib/card-constants";
 import { NextRequest, NextResponse } from "next/server";
 
 // app/api/search/route.ts
@@ -45,22 +46,10 @@ export async function GET(request: NextRequest) {
             query.rarity = { $in: rarities.map(r => r.toLowerCase()) };
         }
 
-        // Prepare $and conditions array if we need it for complex conditions
-        const andConditions = [];
-
-        // Handle format legality filtering
+        // Handle format legality filtering: legal or restricted in any of the formats,
+        // as a single bit test on the legality mask the updater stores on every card
         if (formats.length > 0) {
-            const formatQueries = formats.map(format => {
-                const formatKey = `legalities.${format.toLowerCase()}`;
-                return { [formatKey]: { $in: ['legal', 'restricted'] } };
-            });
-
-            // Add the format to andConditions
-            andConditions.push({ $or: formatQueries });
-        }
-
-        if (andConditions.length > 0) {
-            query.$and = andConditions;
+            query.legality_mask = { $bitsAnySet: formatsToLegalityMask(formats) };
         }
 
         
@@ -70,84 +59,29 @@ export async function GET(request: NextRequest) {
         // initialize query result variable
         let cards = [];
 
-        // non-price sorting options
+        // sorting options
         const sortOptions: any = {};
 
-        // Build the sort pipeline for price sorting
-        let pipeline = [];
-
-        // Handle price sorting by adding calculated fields
+        // Handle price sorting on the numeric price keys precomputed by the updater
         if (sort === 'price_asc' || sort === 'price_desc') {
-            
-            // First, get the query
-            pipeline.push({ $match: query });
-
-            // Add a stage to compute the lowest non-null price for each card
-            pipeline.push({
-                $addFields: {
-                    hasPrices: {
-                        $cond: {
-                            if: {
-                                $or: [
-                                    { $ne: ["$prices.usd", null] },
-                                    { $ne: ["$prices.usd_foil", null] },
-                                    { $ne: ["$prices.usd_etched", null] }
-                                ]
-                            },
-                            then: 1,
-                            else: 0
-                        }
-                    },                    
-                    lowestPrice: {
-                        $min: {
-                            $filter: {
-                                input: [
-                                    { $toDouble: { $ifNull: ["$prices.usd", null] } },
-                                    { $toDouble: { $ifNull: ["$prices.usd_foil", null] } },
-                                    { $toDouble: { $ifNull: ["$prices.usd_etched", null] } }
-                                ],
-                                as: "price",
-                                cond: { $ne: ["$$price", null] }
-                            }
-                        }
-                    },
-                    highestPrice: {
-                        $max: {
-                            $filter: {
-                                input: [
-                                    { $toDouble: { $ifNull: ["$prices.usd", null] } },
-                                    { $toDouble: { $ifNull: ["$prices.usd_foil", null] } },
-                                    { $toDouble: { $ifNull: ["$prices.usd_etched", null] } }
-                                ],
-                                as: "price",
-                                cond: { $ne: ["$$price", null] }
-                            }
-                        }
-                    }
-                }
-            });
-            
-            // filter out the records that don't have prices
-            pipeline.push({
-                $match: {
-                    hasPrices: 1
-                }
-            });
+            // cards without any price have no lowest_price/highest_price and are left out, as before
+            const priceQuery = { ...query, lowest_price: { $ne: null } };
 
             // actually do the sorting lol dumbass
+            // cheapest finish first when ascending, most expensive finish first when descending
             if (sort === 'price_asc') {
-                pipeline.push({ $sort: { lowestPrice: 1, name: 1 } });
+                sortOptions.lowest_price = 1;
             } else { // price_desc
-                pipeline.push({ $sort: { lowestPrice: -1, name: 1 } });
+                sortOptions.highest_price = -1;
             }
+            sortOptions.name = 1;
 
-
-            // adding pagination to pipeline output
-            pipeline.push({ $skip: skip });
-            pipeline.push({ $limit: pageSize });
-
-            // execute aggregated pipeline for price sorting
-            cards = await db.collection(COLLECTIONS.cards).aggregate(pipeline).toArray();
+            cards = await db.collection(COLLECTIONS.cards)
+                .find(priceQuery)
+                .sort(sortOptions)
+                .skip(skip)
+                .limit(pageSize)
+                .toArray();
         } else { // non-price aggregation
             switch (sort) {
                 case 'release_desc':
@@ -171,30 +105,25 @@ export async function GET(request: NextRequest) {
                 .toArray();
         }
 
-        // For each card, get the latest price data for each finish in the card_prices collection
-        const enhancedCards = await Promise.all(cards.map(async (card) => {
-            // Get the latest price for each finish type
-            const finishTypes = ['nonfoil', 'foil', 'etched'];
-            const latestPrices: any = {};
-            
-            await Promise.all(finishTypes.map(async (finish) => {
-                const latestPriceData = await db.collection(COLLECTIONS.card_prices)
-                    .find({ 
-                        card_key: card.card_key,
-                        finish: finish
-                    })
-                    .sort({ date: -1 }) // Sort by date descending to get the latest
-                    .limit(1)
-                    .toArray();
-                
-                if (latestPriceData.length > 0) {
-                    // Store latest price for this finish
-                    latestPrices[finish] = {
-                        price: latestPriceData[0].price,
-                        date: latestPriceData[0].date
-                    };
+        // Get the latest price for each finish of every card on the page in one lookup
+        // against card_latest_prices, which the daily updater keeps current
+        const latestPriceDocs = await db.collection(COLLECTIONS.card_latest_prices)
+            .find({ card_key: { $in: cards.map(card => card.card_key) } })
+            .toArray();
+
+        const latestPricesByCard: any = {};
+        for (const latestPriceDoc of latestPriceDocs) {
+            latestPricesByCard[latestPriceDoc.card_key] = {
+                ...latestPricesByCard[latestPriceDoc.card_key],
+                [latestPriceDoc.finish]: {
+                    price: latestPriceDoc.price,
+                    date: latestPriceDoc.date
                 }
-            }));
+            };
+        }
+
+        const enhancedCards = cards.map((card) => {
+            const latestPrices: any = latestPricesByCard[card.card_key] || {};
             
             // Merge the latest prices into the card's prices object
             const enhancedCard = { ...card };
@@ -204,7 +133,7 @@ export async function GET(request: NextRequest) {
                 enhancedCard.prices = {};
             }
             
-            // Add latest prices from our timeseries collection
+            // Add latest prices from the latest price collection
             if (latestPrices.nonfoil) {
                 enhancedCard.latest_prices = {
                     ...enhancedCard.latest_prices,
@@ -227,7 +156,7 @@ export async function GET(request: NextRequest) {
             }
             
             return enhancedCard;
-        }));
+        });
 
     
         // Return search results with pagination info
@@ -23,6 +23,42 @@ export const CARD_FINISHES = [
 ] as const;
   
 
+// Scryfall legality formats in the bit order of the cards' `legality_mask` field.
+// Must match LEGALITY_FORMATS in project_files/constants.py
+export const LEGALITY_FORMATS = [
+    'standard',
+    'future',
+    'historic',
+    'timeless',
+    'gladiator',
+    'pioneer',
+    'explorer',
+    'modern',
+    'legacy',
+    'pauper',
+    'vintage',
+    'penny',
+    'commander',
+    'oathbreaker',
+    'standardbrawl',
+    'brawl',
+    'alchemy',
+    'paupercommander',
+    'duel',
+    'oldschool',
+    'premodern',
+    'predh'
+] as const;
+
+// Bitmask with the legality_mask bit of each given format set (unknown formats are ignored)
+export function formatsToLegalityMask(formats: string[]): number {
+    return formats.reduce((mask, format) => {
+        const bit = LEGALITY_FORMATS.indexOf(format.toLowerCase() as typeof LEGALITY_FORMATS[number]);
+        return bit >= 0 ? mask | (1 << bit) : mask;
+    }, 0);
+}
+  
+
 export type CardFormat = typeof CARD_FORMATS[number];
 export type CardRarity = typeof CARD_RARITIES[number];
 export type CardFinish = typeof CARD_FINISHES[number];
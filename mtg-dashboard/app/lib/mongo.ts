@@ -20,7 +20,8 @@ let cachedDb: Db | null = null;
 // define the names of the MongoDB collections in the database (potentially subject to update)
 export const COLLECTIONS = {
     cards: 'cards',
-    card_prices: 'card_prices'
+    card_prices: 'card_prices',
+    card_latest_prices: 'card_latest_prices'
   };  
 
 export async function connectToDatabase() {
@@ -0,0 +1,269 @@
+"""
+Historical Price Backfill
+
+Replays a directory of dated Scryfall bulk files into the card_prices collection,
+stamping each file's prices with the file's own `updated_at` date instead of today.
+Files are processed concurrently in a process pool; each worker streams its file
+and writes price points through large unordered insert_many batches. Every file's
+progress is recorded in the ingestion ledger, so a file whose worker failed partway
+is resumed on the next run instead of being skipped.
+
+Usage:
+    python backfill_prices.py <bulk_dir> [--workers N] [--format all] [--force]
+"""
+from logger import get_logger
+from bulk_data_reader import iter_bulk_cards
+from scryfall_daily_updater import DailyPriceUpdater
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+import argparse
+import re
+import sys
+from constants import *
+
+
+logger = get_logger(__name__)
+
+# Bulk cache filenames look like `default_cards-2025-03-20T09-06-49.386-00-00.json.gz`
+_BULK_FILENAME_DATE_RE = re.compile(r'-(\d{4}-\d{2}-\d{2})T')
+
+# Ingestion ledger bulk_type of backfilled price dates, kept apart from the daily updater's entries
+BACKFILL_LEDGER_TYPE = "backfill"
+
+
+def price_date_from_filename(bulk_data_path: Path) -> Optional[datetime]:
+    """
+    Get the price date of a bulk file from the `updated_at` stamp in its filename.
+
+    Args:
+        bulk_data_path: Path to a bulk data file named like the daily updater's cache
+
+    Returns:
+        Midnight of the file's updated_at date, or None if the name has no stamp
+    """
+    match = _BULK_FILENAME_DATE_RE.search(bulk_data_path.name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y-%m-%d")
+
+
+def find_bulk_files(bulk_dir: Path) -> List[Tuple[Path, datetime]]:
+    """
+    Find the dated bulk files in a directory, keeping one file per price date.
+
+    Args:
+        bulk_dir: Directory of bulk data files (.json, .json.gz or .json.zst)
+
+    Returns:
+        List of (path, price_date) tuples sorted by date
+    """
+    files_by_date = {}
+    for file_path in sorted(Path(bulk_dir).iterdir()):
+        if not re.search(r'\.json(\.gz|\.zst)?$', file_path.name):
+            continue
+
+        price_date = price_date_from_filename(file_path)
+        if price_date is None:
+            logger.warning(f"Skipping {file_path.name}: no updated_at date in the filename")
+            continue
+
+        # Several snapshots on one day would all land on the same date; keep the latest
+        if price_date in files_by_date:
+            logger.warning(f"Multiple bulk files for {price_date.date()}, using {file_path.name}")
+        files_by_date[price_date] = file_path
+
+    return sorted(((path, date) for date, path in files_by_date.items()), key=lambda item: item[1])
+
+
+def _backfill_ledger_filter(price_date: datetime) -> Dict:
+    """Ingestion ledger key of a backfilled price date."""
+    return {"bulk_type": BACKFILL_LEDGER_TYPE, "updated_at": price_date.strftime("%Y-%m-%d")}
+
+
+def backfill_bulk_file(bulk_data_path: str, price_date: datetime, mongo_uri: str = MONGO_URI, db_name: str = MONGO_DB_NAME,
+                       format_name: str = "all", force: bool = False, batch_size: int = BACKFILL_INSERT_BATCH_SIZE) -> Dict:
+    """
+    Insert the prices of a single bulk file, dated price_date. Runs in a worker process,
+    so it opens its own MongoDB connection.
+
+    The date is marked in_progress in the ingestion ledger before the first insert and
+    complete after the last one. A date left in_progress by a failed worker is resumed:
+    price points already stored for it (by card_key and finish) are not inserted again.
+
+    Args:
+        bulk_data_path: Path to the bulk data file
+        price_date: Date to stamp every price point with
+        mongo_uri: MongoDB connection string
+        db_name: Database name
+        format_name: Only include cards legal in this format ("all" for every card)
+        force: Insert even if scryfall prices already exist for price_date
+        batch_size: Price documents per unordered insert_many
+
+    Returns:
+        Dict with the file, date, number of price points inserted, whether it was skipped
+        or resumed, and any error
+    """
+    result = {"file": bulk_data_path, "date": price_date, "price_count": 0, "skipped": False, "resumed": False, "error": None}
+    client = MongoClient(mongo_uri)
+    try:
+        prices = client[db_name][MONGO_COLLECTIONS["card_prices"]]
+        latest_prices = client[db_name][MONGO_COLLECTIONS["card_latest_prices"]]
+        ledger = client[db_name][MONGO_COLLECTIONS["ingestion_ledger"]]
+
+        entry = ledger.find_one(_backfill_ledger_filter(price_date), {"_id": 0, "status": 1})
+        resuming = entry is not None and entry.get("status") == "in_progress"
+
+        if not force and not resuming:
+            # Already backfilled, or a date we have from the daily updater, would be duplicated
+            if (entry and entry.get("status") == "complete") or prices.find_one({"date": price_date, "source": "scryfall"}, {"_id": 1}):
+                result["skipped"] = True
+                return result
+
+        # Price points a failed earlier attempt already inserted for this date
+        already_stored = set()
+        if resuming:
+            result["resumed"] = True
+            already_stored = {
+                (doc["card_key"], doc["finish"])
+                for doc in prices.find({"date": price_date, "source": "scryfall"}, {"_id": 0, "card_key": 1, "finish": 1})
+            }
+
+        ledger.update_one(
+            _backfill_ledger_filter(price_date),
+            {"$set": {"status": "in_progress", "file": Path(bulk_data_path).name, "started_at": datetime.now()}},
+            upsert=True
+        )
+
+        # Only used for its card key, legality and price extraction helpers
+        updater = DailyPriceUpdater(mongo_uri=mongo_uri, db_name=db_name, format_name=format_name)
+
+        price_documents = []
+        attempted_count = 0
+        for card_data in iter_bulk_cards(Path(bulk_data_path)):
+            if card_data.get('digital', False):
+                continue
+            if updater.format_name != 'all' and not updater.is_format_legal(card_data):
+                continue
+
+            price_documents.extend(updater.extract_price_data(card_data, price_date))
+            if len(price_documents) >= batch_size:
+                attempted_count += _write_price_batch(prices, latest_prices, price_documents, already_stored, result)
+                price_documents = []
+
+        if price_documents:
+            attempted_count += _write_price_batch(prices, latest_prices, price_documents, already_stored, result)
+
+        # Leave the date in_progress so the next run retries the missing price points
+        if result["price_count"] < attempted_count:
+            raise RuntimeError(f"{attempted_count - result['price_count']} price documents failed to insert")
+
+        ledger.update_one(
+            _backfill_ledger_filter(price_date),
+            {"$set": {
+                "status": "complete",
+                "completed_at": datetime.now(),
+                "price_points": len(already_stored) + result["price_count"],
+            }}
+        )
+
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        client.close()
+
+    return result
+
+
+def _write_price_batch(prices, latest_prices, price_documents: List[Dict], already_stored: set, result: Dict) -> int:
+    """
+    Insert the batch's price points that aren't already stored for the date, counting them
+    into result, and fold the whole batch into card_latest_prices (which is idempotent, so
+    points a failed attempt inserted without updating the latest prices are caught up).
+    Returns the number of price points that were to be inserted.
+    """
+    new_documents = [doc for doc in price_documents if (doc["card_key"], doc["finish"]) not in already_stored]
+    if new_documents:
+        result["price_count"] += _insert_unordered(prices, new_documents)
+    _upsert_latest_prices(latest_prices, price_documents)
+    return len(new_documents)
+
+
+def _insert_unordered(collection, documents: List[Dict]) -> int:
+    """
+    insert_many without ordering, so the server can parallelise the batch and one bad
+    document doesn't stop the rest. Returns the number of documents inserted.
+    """
+    try:
+        return len(collection.insert_many(documents, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        logger.warning(f"{len(e.details.get('writeErrors', []))} price documents failed to insert")
+        return e.details.get('nInserted', 0)
+
+
+def _upsert_latest_prices(collection, price_documents: List[Dict]) -> None:
+    """
+    Fold backfilled price points into card_latest_prices. Points older than the stored
+    latest price leave it untouched, so backfilling history never rolls it back, and the
+    upsert keeps the previous price right whatever order the dates are written in.
+    """
+    collection.bulk_write(DailyPriceUpdater.latest_price_operations(price_documents), ordered=False)
+
+
+def run_backfill(bulk_dir: Path, max_workers: int = BACKFILL_MAX_WORKERS, format_name: str = "all", force: bool = False) -> bool:
+    """
+    Backfill card_prices from every dated bulk file in a directory.
+
+    Args:
+        bulk_dir: Directory of dated bulk data files
+        max_workers: Number of files processed concurrently
+        format_name: Only include cards legal in this format ("all" for every card)
+        force: Re-insert dates that already have scryfall prices
+
+    Returns:
+        bool: True if every file was backfilled (or skipped) without errors
+    """
+    bulk_files = find_bulk_files(bulk_dir)
+    if not bulk_files:
+        logger.error(f"No dated bulk files found in {bulk_dir}")
+        return False
+
+    logger.info(f"Backfilling {len(bulk_files)} bulk files from {bulk_files[0][1].date()} to {bulk_files[-1][1].date()} with {max_workers} workers")
+
+    total_prices = 0
+    failed_files = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(backfill_bulk_file, str(path), price_date, MONGO_URI, MONGO_DB_NAME, format_name, force)
+            for path, price_date in bulk_files
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            file_name = Path(result["file"]).name
+            if result["error"]:
+                failed_files += 1
+                logger.error(f"Backfill of {file_name} failed after {result['price_count']} price points: {result['error']}")
+            elif result["skipped"]:
+                logger.info(f"Skipped {file_name}: prices for {result['date'].date()} already exist")
+            else:
+                total_prices += result["price_count"]
+                resumed = " (resumed an interrupted backfill)" if result["resumed"] else ""
+                logger.info(f"Backfilled {result['price_count']} price points for {result['date'].date()} from {file_name}{resumed}")
+
+    logger.info(f"Backfill completed: {total_prices} price points from {len(bulk_files)} files, {failed_files} failed")
+    return failed_files == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill card_prices from a directory of dated Scryfall bulk files.")
+    parser.add_argument("bulk_dir", type=Path, help="Directory of bulk files named <type>-<updated_at>.json[.gz|.zst]")
+    parser.add_argument("--workers", type=int, default=BACKFILL_MAX_WORKERS, help="Number of files processed concurrently")
+    parser.add_argument("--format", default="all", help="Only include cards legal in this format")
+    parser.add_argument("--force", action="store_true", help="Insert prices even for dates that already have them")
+    args = parser.parse_args()
+
+    success = run_backfill(args.bulk_dir, max_workers=args.workers, format_name=args.format, force=args.force)
+    sys.exit(0 if success else 1)
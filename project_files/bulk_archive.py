@@ -0,0 +1,328 @@
+"""
+Delta-encoded archive of daily Scryfall bulk snapshots.
+
+Instead of keeping a full bulk file per day, the archive stores one full base
+snapshot plus, for every later day, only the cards that changed (or disappeared)
+since the previous archived day, keyed by `card_key`. Cards where only frequently
+changing fields such as `prices` changed are stored as a patch of just those fields,
+so a delta grows with the day's changes rather than with the number of cards
+touched. Any archived day's card list can be rebuilt by replaying the deltas on top
+of the base, streaming one card at a time.
+
+Layout of an archive directory (one per bulk data type):
+    manifest.json            - archived days, in order, and the base snapshot's day
+    base-<stamp>.jsonl.gz    - every card of the first archived day, one per line
+    delta-<stamp>.jsonl.gz   - one change per line, one of
+                                 {"op": "upsert", "card_key": ..., "card": {...}}
+                                 {"op": "patch", "card_key": ..., "set": {...}, "unset": [...]}
+                                 {"op": "remove", "card_key": ...}
+    index-<stamp>.json.gz    - card_key -> field group hashes of the latest archived day
+
+The manifest is rewritten last, so it is the commit point of each archived day.
+"""
+from logger import get_logger
+from bulk_data_reader import iter_bulk_cards, open_bulk_file
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+import gzip
+import hashlib
+import json
+
+
+logger = get_logger(__name__)
+
+# Fields that change independently of the rest of a card (prices every day), hashed
+# separately in the index so a change to only these is archived as a patch
+PATCH_FIELDS = ("prices", "edhrec_rank", "penny_rank", "legalities", "purchase_uris")
+
+# Index key of the hash over all the other fields of a card
+_REST_HASH_KEY = "*"
+
+
+class BulkSnapshotArchive:
+    """
+    Archive of daily bulk snapshots stored as a base snapshot plus per-day deltas.
+    """
+    def __init__(self, archive_dir: Path, key_func: Callable[[Dict], str]) -> None:
+        """
+        Args:
+            archive_dir: Directory holding the archive for a single bulk data type
+            key_func: Function computing the card_key of a Scryfall card
+        """
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.key_func = key_func
+        self.manifest_path = self.archive_dir / "manifest.json"
+        return
+
+    ## MANIFEST AND INDEX ##
+    def _load_manifest(self) -> Dict:
+        """Load the archive manifest, or an empty one for a new archive."""
+        if not self.manifest_path.exists():
+            return {"base": None, "days": [], "index": None}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict) -> None:
+        """Write the manifest atomically so a crash never leaves it half-written."""
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        tmp_path.replace(self.manifest_path)
+
+    def _load_index(self, manifest: Dict) -> Dict[str, Dict[str, str]]:
+        """Load the card_key -> field group hashes index of the latest archived day."""
+        if not manifest.get("index"):
+            return {}
+        with gzip.open(self.archive_dir / manifest["index"], 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_index(self, index: Dict[str, Dict[str, str]], index_path: Path) -> None:
+        with gzip.open(index_path, 'wt', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+
+    @staticmethod
+    def _stamp(updated_at: str) -> str:
+        """Filesystem-safe version of a bulk `updated_at` timestamp (matches the bulk cache filenames)."""
+        return updated_at.replace(':', '-').replace('+', '-')
+
+    @staticmethod
+    def _value_hash(value) -> str:
+        serialized = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+        return hashlib.blake2b(serialized.encode('utf-8'), digest_size=8).hexdigest()
+
+    @classmethod
+    def _card_hashes(cls, card_data: Dict) -> Dict[str, str]:
+        """
+        Hash each of a card's PATCH_FIELDS that it has, plus one hash over all its other fields.
+        """
+        hashes = {field: cls._value_hash(card_data[field]) for field in PATCH_FIELDS if field in card_data}
+        hashes[_REST_HASH_KEY] = cls._value_hash({k: v for k, v in card_data.items() if k not in PATCH_FIELDS})
+        return hashes
+
+    @staticmethod
+    def _card_patch(card_data: Dict, card_hashes: Dict[str, str], previous_hashes) -> Optional[Dict]:
+        """
+        The patch turning the previous version of a card into card_data, or None if more
+        than its PATCH_FIELDS changed (or the previous hashes are from an older index
+        format) and the whole card has to be stored.
+        """
+        if not isinstance(previous_hashes, dict) or previous_hashes.get(_REST_HASH_KEY) != card_hashes[_REST_HASH_KEY]:
+            return None
+        return {
+            "set": {field: card_data[field] for field in PATCH_FIELDS
+                    if field in card_hashes and previous_hashes.get(field) != card_hashes[field]},
+            "unset": [field for field in PATCH_FIELDS if field in previous_hashes and field not in card_hashes],
+        }
+
+    def archived_days(self) -> List[str]:
+        """
+        Returns:
+            List of archived bulk `updated_at` timestamps, oldest first
+        """
+        return list(self._load_manifest()["days"])
+
+    ## ARCHIVING ##
+    def archive(self, bulk_data_path: Path, updated_at: str) -> bool:
+        """
+        Add a bulk file to the archive. The first archived file becomes the base
+        snapshot; later files are stored as the delta against the latest archived day.
+        Days must be archived in chronological order.
+
+        Args:
+            bulk_data_path: Path to the bulk data file (optionally compressed)
+            updated_at: The bulk file's `updated_at` timestamp from Scryfall
+
+        Returns:
+            bool: True if the day was archived (or already was), False on error
+        """
+        try:
+            manifest = self._load_manifest()
+        except (OSError, ValueError) as e:
+            logger.error(f"Cannot archive {updated_at}: unreadable manifest {self.manifest_path}: {e}")
+            return False
+        if updated_at in manifest["days"]:
+            logger.info(f"Bulk snapshot {updated_at} is already archived")
+            return True
+        if manifest["days"] and updated_at < manifest["days"][-1]:
+            logger.error(f"Cannot archive {updated_at}: it is older than the latest archived day {manifest['days'][-1]}")
+            return False
+
+        stamp = self._stamp(updated_at)
+        is_base = manifest["base"] is None
+        output_path = self.archive_dir / (f"base-{stamp}.jsonl.gz" if is_base else f"delta-{stamp}.jsonl.gz")
+        tmp_path = output_path.with_suffix(".tmp")
+
+        try:
+            previous_index = self._load_index(manifest)
+            new_index = {}
+            changed_count = 0
+            patched_count = 0
+
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as out:
+                for card_data in iter_bulk_cards(bulk_data_path):
+                    card_key = self.key_func(card_data)
+                    card_hashes = self._card_hashes(card_data)
+                    new_index[card_key] = card_hashes
+
+                    if is_base:
+                        out.write(json.dumps(card_data, separators=(',', ':'), ensure_ascii=False) + "\n")
+                        continue
+
+                    previous_hashes = previous_index.get(card_key)
+                    if previous_hashes == card_hashes:
+                        continue
+
+                    patch = self._card_patch(card_data, card_hashes, previous_hashes)
+                    if patch is not None:
+                        out.write(json.dumps({"op": "patch", "card_key": card_key, **patch}, separators=(',', ':'), ensure_ascii=False) + "\n")
+                        patched_count += 1
+                    else:
+                        out.write(json.dumps({"op": "upsert", "card_key": card_key, "card": card_data}, separators=(',', ':'), ensure_ascii=False) + "\n")
+                    changed_count += 1
+
+                # Cards that were in the previous day but are gone now
+                removed_count = 0
+                if not is_base:
+                    for card_key in previous_index.keys() - new_index.keys():
+                        out.write(json.dumps({"op": "remove", "card_key": card_key}) + "\n")
+                        removed_count += 1
+
+            tmp_path.replace(output_path)
+            index_path = self.archive_dir / f"index-{stamp}.json.gz"
+            self._save_index(new_index, index_path)
+
+            # Commit the day, then drop the index it replaces
+            previous_index_name = manifest.get("index")
+            if is_base:
+                manifest["base"] = updated_at
+            manifest["days"].append(updated_at)
+            manifest["index"] = index_path.name
+            manifest["updated"] = datetime.now().isoformat()
+            self._save_manifest(manifest)
+            if previous_index_name and previous_index_name != index_path.name:
+                (self.archive_dir / previous_index_name).unlink(missing_ok=True)
+
+            if is_base:
+                logger.info(f"Archived base bulk snapshot {updated_at} with {len(new_index)} cards ({output_path.stat().st_size / (1024*1024):.2f} MB)")
+            else:
+                logger.info(f"Archived bulk delta {updated_at}: {changed_count} changed ({patched_count} as field patches), {removed_count} removed ({output_path.stat().st_size / (1024*1024):.2f} MB)")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error archiving bulk snapshot {updated_at}: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return False
+
+    ## REBUILDING ##
+    def _iter_jsonl(self, path: Path) -> Iterator[Dict]:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    @staticmethod
+    def _apply_patch(card_data: Dict, patch: Dict) -> Dict:
+        card_data.update(patch["set"])
+        for field in patch["unset"]:
+            card_data.pop(field, None)
+        return card_data
+
+    def _collect_changes(self, days: List[str]) -> Dict[str, Dict]:
+        """
+        Compose the deltas of the given days, in order, into one change per card_key:
+        {"op": "upsert", "card": ...}, {"op": "remove"} or a merged {"op": "patch", ...}.
+        Only changed cards are held in memory, not the whole day.
+        """
+        changes = {}
+        for day in days:
+            delta_path = self.archive_dir / f"delta-{self._stamp(day)}.jsonl.gz"
+            for entry in self._iter_jsonl(delta_path):
+                card_key = entry["card_key"]
+                current = changes.get(card_key)
+
+                if entry["op"] != "patch" or current is None:
+                    changes[card_key] = entry
+                elif current["op"] == "upsert":
+                    self._apply_patch(current["card"], entry)
+                elif current["op"] == "patch":
+                    current["set"].update(entry["set"])
+                    current["unset"] = [field for field in current["unset"] if field not in entry["set"]]
+                    for field in entry["unset"]:
+                        current["set"].pop(field, None)
+                        if field not in current["unset"]:
+                            current["unset"].append(field)
+        return changes
+
+    def rebuild(self, updated_at: str) -> Iterator[Dict]:
+        """
+        Rebuild the full card list of an archived day by replaying deltas onto the base.
+        Base cards are streamed and patched one at a time, so only the day's accumulated
+        changes are held in memory.
+
+        Args:
+            updated_at: The archived bulk `updated_at` timestamp to rebuild
+
+        Yields:
+            Card dicts as they were in that day's bulk file
+
+        Raises:
+            KeyError: If the day isn't archived
+        """
+        manifest = self._load_manifest()
+        if updated_at not in manifest["days"]:
+            raise KeyError(f"Bulk snapshot {updated_at} is not in the archive")
+
+        # Days after the base are deltas; compose them in order up to the requested day
+        changes = self._collect_changes(manifest["days"][1:manifest["days"].index(updated_at) + 1])
+
+        card_count = 0
+        base_path = self.archive_dir / f"base-{self._stamp(manifest['base'])}.jsonl.gz"
+        for card_data in self._iter_jsonl(base_path):
+            change = changes.pop(self.key_func(card_data), None)
+            if change is None:
+                yield card_data
+            elif change["op"] == "upsert":
+                yield change["card"]
+            elif change["op"] == "patch":
+                yield self._apply_patch(card_data, change)
+            else:
+                continue
+            card_count += 1
+
+        # Cards added after the base day
+        for change in changes.values():
+            if change["op"] == "upsert":
+                card_count += 1
+                yield change["card"]
+
+        logger.info(f"Rebuilt bulk snapshot {updated_at} with {card_count} cards")
+
+    def write_snapshot(self, updated_at: str, output_path: Path) -> Optional[Path]:
+        """
+        Rebuild an archived day and write it out as a regular bulk data file (a JSON
+        array, compressed according to its .gz/.zst suffix), e.g. for replaying it.
+        The cards are streamed from rebuild, so memory stays flat.
+
+        Args:
+            updated_at: The archived bulk `updated_at` timestamp to rebuild
+            output_path: Where to write the rebuilt bulk file
+
+        Returns:
+            The output path, or None if the day isn't archived
+        """
+        if updated_at not in self.archived_days():
+            logger.error(f"Bulk snapshot {updated_at} is not in the archive")
+            return None
+
+        output_path = Path(output_path)
+        with open_bulk_file(output_path, 'wt') as f:
+            f.write("[\n")
+            for i, card_data in enumerate(self.rebuild(updated_at)):
+                if i:
+                    f.write(",\n")
+                f.write(json.dumps(card_data, ensure_ascii=False))
+            f.write("\n]\n")
+        return output_path
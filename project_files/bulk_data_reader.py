@@ -0,0 +1,162 @@
+"""
+Streaming reader for Scryfall bulk data files.
+
+Scryfall bulk files are a single top-level JSON array holding one object per
+card. Loading them with `json.load` materializes every card at once, so this
+module decodes the array incrementally and yields one card at a time instead.
+
+Cached bulk files may be stored compressed (`.json.zst` or `.json.gz`); they are
+decompressed on the fly while streaming.
+"""
+from pathlib import Path
+from typing import Dict, IO, Iterator, TextIO
+import gzip
+import json
+import re
+
+# zstd is optional; gzip is always available as the fallback
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Default number of characters read from disk per refill of the decode buffer
+DEFAULT_READ_CHUNK_SIZE = 1 << 20
+
+# Whitespace and element separators between array entries
+_SEPARATOR_RE = re.compile(r'[\s,]*')
+
+# Characters that may directly follow a complete array element
+_ELEMENT_END_CHARS = frozenset(' \t\r\n,]')
+
+
+def compressed_bulk_suffix() -> str:
+    """
+    File suffix of the compression used for newly cached bulk files:
+    zstd when the `zstandard` package is installed, gzip otherwise.
+    """
+    return ".zst" if zstandard is not None else ".gz"
+
+
+def open_bulk_file(bulk_data_path: Path, mode: str = 'rt') -> IO:
+    """
+    Open a bulk data file, transparently (de)compressing based on its suffix.
+    Plain `.json` files are opened as-is.
+
+    Args:
+        bulk_data_path: Path to a `.json`, `.json.gz` or `.json.zst` file
+        mode: One of 'rt', 'rb', 'wt', 'wb'
+
+    Returns:
+        File object reading or writing the decompressed JSON
+    """
+    bulk_data_path = Path(bulk_data_path)
+    encoding = 'utf-8' if 't' in mode else None
+
+    if bulk_data_path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"Cannot open {bulk_data_path.name}: the zstandard package is not installed")
+        return zstandard.open(bulk_data_path, mode, encoding=encoding)
+    if bulk_data_path.suffix == ".gz":
+        return gzip.open(bulk_data_path, mode, encoding=encoding)
+    return open(bulk_data_path, mode, encoding=encoding)
+
+
+def iter_json_array(f: TextIO, read_chunk_size: int = DEFAULT_READ_CHUNK_SIZE, with_text: bool = False) -> Iterator[Dict]:
+    """
+    Incrementally decode a top-level JSON array from a text stream, yielding
+    each element as soon as it has been fully read. Only the element currently
+    being decoded (plus at most one read chunk) is held in memory.
+
+    Args:
+        f: Text file object positioned at the start of the array
+        read_chunk_size: Number of characters to read per refill
+        with_text: Yield (element, source_text) pairs, where source_text is the
+            element's JSON exactly as it appears in the stream
+
+    Yields:
+        Each decoded element of the array, in order
+
+    Raises:
+        ValueError: If the stream is not a JSON array or ends mid-element
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(read_chunk_size)
+    pos = _SEPARATOR_RE.match(buffer, 0).end()
+
+    # Make sure we are actually looking at an array
+    while pos >= len(buffer):
+        chunk = f.read(read_chunk_size)
+        if not chunk:
+            raise ValueError("Bulk data stream is empty")
+        buffer += chunk
+        pos = _SEPARATOR_RE.match(buffer, pos).end()
+
+    if buffer[pos] != '[':
+        raise ValueError("Bulk data stream does not start with a JSON array")
+    pos += 1
+
+    eof = False
+    while True:
+        pos = _SEPARATOR_RE.match(buffer, pos).end()
+
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+
+        try:
+            if pos >= len(buffer):
+                raise json.JSONDecodeError("Need more data", buffer, pos)
+            element, end = decoder.raw_decode(buffer, pos)
+            # A scalar cut off by the end of the buffer can still decode as a shorter
+            # value (e.g. `12` of `12345`, or `1` of `1.5`), so only accept an element
+            # once it is followed by a separator or the stream is exhausted
+            if not eof and (end >= len(buffer) or buffer[end] not in _ELEMENT_END_CHARS):
+                raise json.JSONDecodeError("Element may continue in the next chunk", buffer, end)
+            text = buffer[pos:end] if with_text else None
+            pos = end
+        except json.JSONDecodeError:
+            # The element straddles the end of the buffer (or the buffer is
+            # exhausted), so drop what we've consumed and read another chunk
+            if eof:
+                raise ValueError("Bulk data stream ended before the JSON array was closed")
+            chunk = f.read(read_chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield (element, text) if with_text else element
+
+
+def iter_bulk_cards(bulk_data_path: Path, read_chunk_size: int = DEFAULT_READ_CHUNK_SIZE, with_text: bool = False) -> Iterator[Dict]:
+    """
+    Stream the cards of a Scryfall bulk data file one at a time.
+
+    Args:
+        bulk_data_path: Path to a Scryfall bulk data JSON file, optionally compressed
+        read_chunk_size: Number of characters to read per refill
+        with_text: Yield (card, source_text) pairs with each card's JSON as stored in the file
+
+    Yields:
+        Card data dicts from the bulk file, in file order
+    """
+    with open_bulk_file(bulk_data_path, 'rt') as f:
+        yield from iter_json_array(f, read_chunk_size, with_text)
+
+
+def iter_json_lines(jsonl_path: Path) -> Iterator[Dict]:
+    """
+    Stream the objects of a JSON lines file (one JSON document per line), skipping blank lines.
+
+    Args:
+        jsonl_path: Path to the file, optionally compressed like a bulk data file
+
+    Yields:
+        Each decoded line, in file order
+    """
+    with open_bulk_file(jsonl_path, 'rt') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
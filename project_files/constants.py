@@ -10,6 +10,7 @@ DB_PATH = DATA_DIR / "mtg_prices.db"
 SET_DATA_DIR = DATA_DIR / "set_data"
 MODELS_DIR = PROJECT_ROOT / "models"
 SCRYFALL_BULK_DIR = DATA_DIR / "scryfall_bulk_daily"
+SCRYFALL_BULK_ARCHIVE_DIR = DATA_DIR / "scryfall_bulk_archive"
 
 # Read credentials from the file in the project root
 with open(PROJECT_ROOT / "credentials.txt") as f:
@@ -31,15 +32,74 @@ SCRYFALL_HEADERS = {
 }
 
 SCRYFALL_BULK_DATA_URL = "https://api.scryfall.com/bulk-data"
+BULK_DOWNLOAD_CHUNK_SIZE = 1 << 20 # bytes per chunk when streaming a bulk data download to disk
+BULK_CACHE_KEEP_COUNT = 7 # compressed bulk files of each type kept in SCRYFALL_BULK_DIR
 
 # MongoDB constants
 MONGO_URI = "mongodb://localhost:27017/"
 MONGO_DB_NAME = "mtg_price_tracker"
 MONGO_COLLECTIONS = {
     "cards": "cards",
-    "card_prices": "card_prices" # time series collection
+    "card_prices": "card_prices", # time series collection
+    "card_latest_prices": "card_latest_prices", # latest and previous price per card_key + finish
+    "card_price_stats": "card_price_stats", # rolling price statistics per card_key + finish
+    "top_movers": "top_movers", # daily gainers/losers rankings per format + finish
+    "price_indices": "price_indices", # daily set and format price indices, one point per index and day
+    "oracle_rollup": "oracle_rollup", # cheapest/most expensive printing per oracle_id
+    "ingestion_ledger": "ingestion_ledger", # bulk files already committed by the daily updater
+    "goldfish_import_ledger": "goldfish_import_ledger" # fingerprint and last imported date of every imported Goldfish price history CSV
 }
 
+# Daily updater pipeline settings
+UPDATE_BATCH_SIZE = 1000 # bulk file cards per change-tracking/write batch
+PIPELINE_READ_QUEUE_SIZE = 4 # raw card batches buffered between the reader and transform stages
+PIPELINE_WRITE_QUEUE_SIZE = 4 # transformed batches buffered between the transform and writer stages
+INGEST_WORKER_COUNT = 1 # processes the daily ingest is sharded across by card_key (1 = single process)
+PRICE_CHANGES_ONLY = False # store a card_prices point only when the price changed since the last stored one
+ARCHIVE_BULK_DATA = False # add each day's bulk file to the delta-encoded snapshot archive in SCRYFALL_BULK_ARCHIVE_DIR
+
+# Scryfall legality formats, in the bit order of the per-card `legality_mask`
+# (bit i set = legal or restricted in LEGALITY_FORMATS[i]). Only ever append to this
+# list: reordering it changes the meaning of every stored mask
+LEGALITY_FORMATS = [
+    'standard',
+    'future',
+    'historic',
+    'timeless',
+    'gladiator',
+    'pioneer',
+    'explorer',
+    'modern',
+    'legacy',
+    'pauper',
+    'vintage',
+    'penny',
+    'commander',
+    'oathbreaker',
+    'standardbrawl',
+    'brawl',
+    'alchemy',
+    'paupercommander',
+    'duel',
+    'oldschool',
+    'premodern',
+    'predh'
+]
+
+# MTGGoldfish history import settings
+GOLDFISH_CARD_BATCH_SIZE = 200 # cards per existing-date coverage aggregation
+GOLDFISH_INSERT_BATCH_SIZE = 10000 # price documents per unordered insert_many
+GOLDFISH_PARSE_WORKERS = os.cpu_count() or 1 # processes parsing price history CSVs in parallel
+
+# Rolling price statistics settings
+PRICE_STATS_WINDOWS = (1, 7, 30) # days to compute percentage price changes over
+TOP_MOVERS_COUNT = 50 # gainers and losers kept per format/finish/rarity ranking
+TOP_MOVERS_MIN_PRICE = 0.5 # cards below this price (USD) are left out of the rankings
+
+# Historical backfill settings
+BACKFILL_INSERT_BATCH_SIZE = 10000 # price documents per unordered insert_many
+BACKFILL_MAX_WORKERS = 4 # bulk files processed concurrently
+
 DIGITAL_ONLY_SET_CODES = [
     'ajmp',
     'akr',
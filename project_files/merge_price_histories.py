@@ -1,18 +1,138 @@
 from logger import get_logger
-from constants import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTIONS, SET_DATA_DIR
-from datetime import datetime
-from pymongo import MongoClient
+from constants import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTIONS, SET_DATA_DIR, GOLDFISH_CARD_BATCH_SIZE, GOLDFISH_INSERT_BATCH_SIZE, GOLDFISH_PARSE_WORKERS
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pymongo import MongoClient, ReplaceOne
+from pymongo.errors import BulkWriteError
+import numpy as np
+import hashlib
 import os
 import json
-import csv
 
 logger = get_logger(__name__)
 
+# Dates are passed around as int64 days since this epoch
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch_day(date):
+    """Convert a datetime to days since EPOCH."""
+    return (date - EPOCH).days
+
+
+def from_epoch_day(epoch_day):
+    """Convert days since EPOCH back to a (midnight) datetime."""
+    return EPOCH + timedelta(days=int(epoch_day))
+
+
+def decode_price_lines(data, cutoff_day, line_offset=0):
+    """
+    Decode the bytes of a MTGGoldfish price history CSV in the fixed `YYYY-MM-DD,price`
+    layout with NumPy, a whole file at a time instead of row by row.
+    Dates are validated and converted with vectorized digit arithmetic, the cutoff is
+    applied as a mask, and empty prices become NaN. Malformed rows are dropped as a batch.
+    Returns (dates, prices, errors): int64 epoch days before cutoff_day, float64 prices,
+    and a list of (line_number, line) tuples for the malformed rows, numbered from
+    line_offset + 1 (for data that is the tail of a file).
+    """
+    # Blank lines are skipped silently; line numbers are kept for the error report
+    lines = np.array([line.strip() for line in data.splitlines()], dtype=bytes)
+    line_numbers = np.flatnonzero(lines != b'') + line_offset + 1
+    lines = lines[lines != b'']
+    if len(lines) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), []
+
+    # The first 11 bytes of every row as a (rows, 11) byte matrix: "YYYY-MM-DD,"
+    head = np.frombuffer(lines.astype('S11').tobytes(), dtype=np.uint8).reshape(-1, 11)
+    digits = head.astype(np.int64) - ord('0')
+    digit_columns = [0, 1, 2, 3, 5, 6, 8, 9]
+    valid = (
+        np.all((digits[:, digit_columns] >= 0) & (digits[:, digit_columns] <= 9), axis=1)
+        & (head[:, 4] == ord('-')) & (head[:, 7] == ord('-')) & (head[:, 10] == ord(','))
+    )
+
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 5] * 10 + digits[:, 6]
+    day = digits[:, 8] * 10 + digits[:, 9]
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+
+    # Build the dates from the month plus day offset; a day past the month's end
+    # (e.g. 02-30) rolls into the next month, which marks it invalid
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    dates = months.astype('datetime64[D]') + np.where(valid, day - 1, 0)
+    valid &= dates.astype('datetime64[M]') == months
+
+    # Prices are whatever follows the comma; empty means no price that day
+    price_text = np.char.strip(np.char.partition(lines, b',')[:, 2])
+    prices = np.full(len(lines), np.nan, dtype=np.float64)
+    has_price = valid & (price_text != b'')
+    try:
+        prices[has_price] = price_text[has_price].astype(np.float64)
+    except ValueError:
+        # Some price is malformed: convert one by one to find which rows to reject
+        for index in np.flatnonzero(has_price):
+            try:
+                prices[index] = float(price_text[index])
+            except ValueError:
+                valid[index] = False
+
+    errors = [(int(line_numbers[index]), lines[index].decode('utf-8', 'replace')) for index in np.flatnonzero(~valid)]
+
+    epoch_days = dates.astype(np.int64)
+    keep = valid & (epoch_days < cutoff_day)
+    return epoch_days[keep], prices[keep], errors
+
+
+def parse_price_file_columnar(file_path, cutoff_day, ledger_entry=None):
+    """
+    Parse a MTGGoldfish price history CSV file into columns.
+    Runs in the parse worker processes, so it only uses its arguments.
+    With the file's ledger_entry from an earlier import, only rows dated after its
+    max_date are returned, and when the file has only been appended to since then
+    only the appended tail is decoded.
+    Returns (file_path, dates, prices, errors, fingerprint): dates as an int64 array of
+    epoch days before cutoff_day, prices as a float64 array with NaN for days without a
+    price, the (line_number, line) tuples of rows rejected as malformed, and the file's
+    size, mtime and content hash for the import ledger (None if it couldn't be read).
+    """
+    empty = (file_path, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), [])
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+            stat = os.fstat(f.fileno())
+        fingerprint = {"size": len(data), "mtime_ns": stat.st_mtime_ns, "hash": hashlib.sha1(data).hexdigest()}
+
+        if not ledger_entry:
+            return (file_path, *decode_price_lines(data, cutoff_day), fingerprint)
+
+        # Only the mtime changed, nothing to import
+        if fingerprint["hash"] == ledger_entry["hash"]:
+            return (*empty, fingerprint)
+
+        # Appended to since the last import: the old content is an unchanged prefix ending on a line break
+        start = 0
+        old_size = ledger_entry["size"]
+        if (len(data) > old_size and data[old_size-1:old_size] in (b'\n', b'\r')
+                and hashlib.sha1(data[:old_size]).hexdigest() == ledger_entry["hash"]):
+            start = old_size
+
+        dates, prices, errors = decode_price_lines(data[start:], cutoff_day, line_offset=data.count(b'\n', 0, start))
+
+        if ledger_entry.get("max_date"):
+            newer = dates > to_epoch_day(datetime.strptime(ledger_entry["max_date"], "%Y-%m-%d"))
+            dates, prices = dates[newer], prices[newer]
+
+        return file_path, dates, prices, errors, fingerprint
+    except Exception as e:
+        logger.error(f"Error opening or parsing  {file_path}: {e}")
+        return (*empty, None)
+
+
 class GoldfishPriceImporter:
     """
     Class to handle importing MTGGoldfish price history into the MongoDB database.
     """
-    def __init__(self, mongo_uri=MONGO_URI, db_name=MONGO_DB_NAME):
+    def __init__(self, mongo_uri=MONGO_URI, db_name=MONGO_DB_NAME, use_import_ledger=True):
         self.mongo_uri = mongo_uri
         self.db_name = db_name
         self.client = None
@@ -30,6 +150,27 @@ class GoldfishPriceImporter:
             "prerelease": "p",
         }
 
+        # Rows rejected as malformed by the price file decoder during this import
+        self.malformed_row_count = 0
+
+        # Fingerprint ledger of imported price files, kept in the db the prices were imported
+        # into (use_import_ledger=False to always re-import every file), the ledger entries
+        # updated this run, and the price documents that failed to insert this run
+        # (the ledger isn't saved if any did)
+        self.use_import_ledger = use_import_ledger
+        self.import_ledger = {}
+        self.updated_ledger_paths = set()
+        self.failed_insert_count = 0
+
+        # Price dates per (card_key, finish) of the cards processed since the documents were
+        # last inserted, including the ones still pending (the db doesn't know about those yet)
+        self.coverage = {}
+        self.coverage_card_keys = set()
+
+        # In-memory lookup indexes over the cards collection, built once per import by build_card_index
+        self.cards_by_key = {}
+        self.cards_by_name_set = {}
+
         return
     
     def connect_to_db(self) -> bool:
@@ -98,6 +239,35 @@ class GoldfishPriceImporter:
 
 
 
+    def build_card_index(self):
+        """
+        Load every card once, with only the fields the import needs, into in-memory
+        lookup indexes: card_key -> card, and (name, set) -> candidate cards.
+        Returns the number of cards indexed.
+        """
+        self.cards_by_key = {}
+        self.cards_by_name_set = {}
+
+        projection = {
+            "_id": 0,
+            "card_key": 1,
+            "name": 1,
+            "set": 1,
+            "collector_number": 1,
+            "promo_types": 1,
+            "frame_effects": 1
+        }
+        for card in self.db[MONGO_COLLECTIONS["cards"]].find({}, projection):
+            self.cards_by_key[card.get("card_key")] = card
+            self.cards_by_name_set.setdefault((card.get("name"), card.get("set")), []).append(card)
+
+        logger.info(f"Indexed {len(self.cards_by_key)} cards for matching")
+        return len(self.cards_by_key)
+    
+
+
+
+
     def determine_card_key(self, card_info):
         """
         Determines the correct card_key for a MTGGoldfish card based on tags and other info
@@ -154,14 +324,15 @@ class GoldfishPriceImporter:
         """
         Find a matching card in the database by card_key.
         If card_key is None, try to find by name and set.
-        Returns (card, card_key) tuple.
+        Lookups go to the in-memory indexes from build_card_index, not the database.
+        Returns the matching card, or None.
         """
         card_name = card_info.get('name', '')
         base_set_code = card_info.get('set_code', '').lower()
 
         # if we got a valid card_key from determine_card_key, use that
         if card_key:
-            card = self.db[MONGO_COLLECTIONS["cards"]].find_one({"card_key": card_key})
+            card = self.cards_by_key.get(card_key)
 
             if card:
                 return card
@@ -170,10 +341,7 @@ class GoldfishPriceImporter:
                 logger.warning(f"Card not found for proper card_key: {card_key}, card name: {card_name}")
         
         # if we have 'None', try finding by name and set (really old sets don't have collector numbers)
-        cards = list(self.db[MONGO_COLLECTIONS["cards"]].find({
-            "name": card_name,
-            "set": base_set_code
-        }))
+        cards = self.cards_by_name_set.get((card_name, base_set_code), [])
 
         if len(cards) == 1:
             logger.info(f"Found card by name and set: {card_name}, {base_set_code}")
@@ -193,77 +361,194 @@ class GoldfishPriceImporter:
     def parse_price_file(self, file_path):
         """
         Parse a MTGGoldfish price history CSV file.
-        Returnsd a list of (date, price) tuples.
+        Returns a list of (date, price) tuples.
         """
-        price_data = []
+        _, dates, prices, errors, _ = parse_price_file_columnar(file_path, to_epoch_day(self.cutoff_date))
+        self.report_malformed_rows(file_path, errors)
+        price_data = [
+            (from_epoch_day(epoch_day), None if np.isnan(price) else float(price))
+            for epoch_day, price in zip(dates, prices)
+        ]
+        logger.debug(f"Parsed {len(price_data)} price points from {file_path}")
+        return price_data
+
+
+
+
 
-        try:
-            with open(file_path, 'r') as f:
-                csv_reader = csv.reader(f)
-                for row in csv_reader:
-                    if len(row) >= 2:
-                        try:
-                            date_str = row[0]
-                            price_str = row[1]
-
-                            date = datetime.strptime(date_str, '%Y-%m-%d')
-                            price = float(price_str) if price_str else None
-
-                            # Only include dates before the cutoff
-                            if date < self.cutoff_date:
-                                price_data.append((date, price))
-                        except Exception as e:
-                            logger.error(f"Error parsing row {row} in {file_path}: {e}")
-                
-            logger.debug(f"Parsed {len(price_data)} price points from {file_path}")
-            return price_data
-        except Exception as e:
-            logger.error(f"Error opening or parsing  {file_path}: {e}")
-            return []   
 
 
+    def report_malformed_rows(self, file_path, errors, max_rows=5):
+        """
+        Log the rows of a price file rejected as malformed, as one report per file.
+        """
+        if not errors:
+            return
+        self.malformed_row_count += len(errors)
+        examples = "; ".join(f"line {line_number}: {line!r}" for line_number, line in errors[:max_rows])
+        more = f" (and {len(errors) - max_rows} more)" if len(errors) > max_rows else ""
+        logger.error(f"Rejected {len(errors)} malformed rows in {file_path}: {examples}{more}")
+
 
 
 
 
 
-    def process_price_data(self, card, price_data, finish):
+
+    def load_import_ledger(self):
         """
-        Process and save price data for a card.
-        Returns number of records inserted.
+        Load the import ledger: price file path (relative to SET_DATA_DIR) -> the card it was
+        imported for, its size, mtime and content hash, and the last imported date.
+        """
+        self.import_ledger = {}
+        self.updated_ledger_paths = set()
+        if not self.use_import_ledger:
+            return
+
+        for entry in self.db[MONGO_COLLECTIONS["goldfish_import_ledger"]].find():
+            self.import_ledger[entry.pop("_id")] = entry
+        logger.info(f"Loaded import ledger with {len(self.import_ledger)} price history files")
+
+
+
+
+
+
+
+    def save_import_ledger(self):
+        """
+        Upsert the import ledger entries recorded this run, keyed by price file path.
+        """
+        if not self.use_import_ledger or not self.updated_ledger_paths:
+            return
+
+        operations = [
+            ReplaceOne({"_id": path}, self.import_ledger[path], upsert=True)
+            for path in sorted(self.updated_ledger_paths)
+        ]
+        for j in range(0, len(operations), GOLDFISH_INSERT_BATCH_SIZE):
+            self.db[MONGO_COLLECTIONS["goldfish_import_ledger"]].bulk_write(operations[j:j+GOLDFISH_INSERT_BATCH_SIZE], ordered=False)
+        logger.info(f"Saved import ledger entries of {len(operations)} price history files")
+
+
+
+
+
+
+
+    def ledger_entry(self, card, finish, file_path):
+        """
+        Returns the ledger entry of a price file, or None if the file was never imported
+        for this card and finish (e.g. the manifest now maps it to a different card).
+        """
+        entry = self.import_ledger.get(os.path.relpath(file_path, SET_DATA_DIR))
+        if not entry or entry.get("card_key") != card.get("card_key") or entry.get("finish") != finish:
+            return None
+        return entry
+
+
+
+
+
+
+
+    def is_unchanged(self, card, finish, file_path):
+        """
+        Returns True if a price file has the same size and mtime as when it was last imported.
+        """
+        entry = self.ledger_entry(card, finish, file_path)
+        if not entry:
+            return False
+        stat = os.stat(file_path)
+        return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+
+
+
+
+
+
+
+    def record_imported_file(self, card, finish, file_path, fingerprint, dates, ledger_entry):
+        """
+        Record a parsed price file's fingerprint and last imported date in the import ledger.
+        """
+        max_date = ledger_entry.get("max_date") if ledger_entry else None
+        if len(dates):
+            newest = from_epoch_day(int(dates.max())).strftime("%Y-%m-%d")
+            max_date = max(max_date, newest) if max_date else newest
+
+        path = os.path.relpath(file_path, SET_DATA_DIR)
+        self.import_ledger[path] = {
+            "card_key": card.get("card_key"),
+            "finish": finish,
+            **fingerprint,
+            "max_date": max_date,
+        }
+        self.updated_ledger_paths.add(path)
+
+
+
+
+
+
+
+    def fetch_existing_coverage(self, card_keys):
+        """
+        Get the price dates already stored for a batch of cards with one aggregation.
+        Returns a dict mapping (card_key, finish) to {"dates"}, where dates is a set of epoch days.
+        """
+        coverage = {}
+        pipeline = [
+            {"$match": {"card_key": {"$in": list(card_keys)}}},
+            {"$group": {
+                "_id": {"card_key": "$card_key", "finish": "$finish"},
+                "dates": {"$addToSet": "$date"}
+            }}
+        ]
+
+        for group in self.db[MONGO_COLLECTIONS["card_prices"]].aggregate(pipeline, allowDiskUse=True):
+            coverage[(group["_id"]["card_key"], group["_id"]["finish"])] = {
+                "dates": {to_epoch_day(date) for date in group["dates"]}
+            }
+
+        return coverage
+
+
+
+
+
+
+
+    def process_price_data(self, card, dates, prices, finish, coverage):
+        """
+        Build the price documents for a card's price history (columns of epoch days
+        and prices, as parsed by parse_price_file_columnar), skipping dates already
+        stored according to coverage (from fetch_existing_coverage, updated in place so
+        a card repeated before the documents are inserted isn't added twice).
+        Returns the list of price documents to insert.
         """ 
         card_key = card.get("card_key", '')
 
         if not card_key:
             logger.error(f"No card_key found for card {card.get('name')}")
-            return 0
+            return []
         
-        # Get all dates we already ahve for this card/finish combination in one query for reference later
-        existing_dates = set()
-        existing_cursor = self.db[MONGO_COLLECTIONS["card_prices"]].find(
-            {"card_key": card_key, "finish": finish},
-            {"date": 1, "_id": 0}  # Only retrieve the date field
-        )
-
-        for doc in existing_cursor:
-            if "date" in doc:
-                existing_dates.add(doc["date"].strftime("%Y-%m-%d"))
-
+        existing = coverage.setdefault((card_key, finish), {"dates": set()})
         
-        # Prepare batch operations for bulk insert
+        # Prepare documents for the batched insert
         price_documents = []
 
-        for date, price in price_data:
+        for epoch_day, price in zip(dates.tolist(), prices.tolist()):
             # skip if we already have this date
-            date_key = date.strftime("%Y-%m-%d")
-            if date_key in existing_dates:
+            if epoch_day in existing["dates"]:
                 continue
+            existing["dates"].add(epoch_day)
             
             # Create price doc
             price_doc = {
                 "card_key": card_key,
-                "date": date,
-                "price": price,
+                "date": from_epoch_day(epoch_day),
+                "price": None if np.isnan(price) else price,
                 "finish": finish,
                 "source": "mtggoldfish",
                 "metadata": {
@@ -276,18 +561,124 @@ class GoldfishPriceImporter:
             }
             price_documents.append(price_doc)
         
-        # Bulk insert the documents we have to add, if any
-        if price_documents:
+        if not price_documents:
+            logger.debug(f"No new price points to add for {card.get('name')} ({card_key})")
+        return price_documents
+
+
+
+
+
+
+
+    def clear_coverage(self):
+        """
+        Forget the coverage looked up so far, once the pending documents are in the db
+        and a fresh query would see them.
+        """
+        self.coverage = {}
+        self.coverage_card_keys = set()
+
+
+
+
+
+
+
+    def insert_price_documents(self, price_documents):
+        """
+        Insert price documents from many cards with large unordered insert_many calls,
+        so the server can apply each batch in parallel and one bad document doesn't stop the rest.
+        Returns number of records inserted.
+        """
+        inserted = 0
+        for j in range(0, len(price_documents), GOLDFISH_INSERT_BATCH_SIZE):
+            batch = price_documents[j:j+GOLDFISH_INSERT_BATCH_SIZE]
             try:
-                result = self.db[MONGO_COLLECTIONS["card_prices"]].insert_many(price_documents)
-                logger.info(f"Added {len(result.inserted_ids)} price points for {card.get('name')} ({card_key})")
-                return len(result.inserted_ids)
+                result = self.db[MONGO_COLLECTIONS["card_prices"]].insert_many(batch, ordered=False)
+                inserted += len(result.inserted_ids)
+            except BulkWriteError as e:
+                logger.error(f"{len(e.details.get('writeErrors', []))} price documents failed to insert")
+                inserted += e.details.get('nInserted', 0)
+                self.failed_insert_count += len(batch) - e.details.get('nInserted', 0)
             except Exception as e:
-                logger.error(f"Error inserting price data for {card_key}: {e}")
-                return 0
-        else:
-            logger.debug(f"No new price points to add for {card.get('name')} ({card_key})")
-            return 0
+                logger.error(f"Error inserting price data batch: {e}")
+                self.failed_insert_count += len(batch)
+
+        logger.info(f"Added {inserted} price points")
+        return inserted
+
+
+
+
+
+
+
+    def iter_parsed_batches(self, card_jobs, executor):
+        """
+        Parse the price files of the matched cards in the executor's worker processes,
+        a batch of GOLDFISH_CARD_BATCH_SIZE cards at a time. The next batch is submitted
+        before the current one is handed back, so parsing overlaps with the database writes.
+        Files already in the import ledger are only parsed past their last imported date.
+        Yields (card_batch, parsed) pairs, parsed holding a (file_path, dates, prices, errors,
+        fingerprint) tuple per card job.
+        """
+        cutoff_day = to_epoch_day(self.cutoff_date)
+        card_batches = [card_jobs[i:i+GOLDFISH_CARD_BATCH_SIZE] for i in range(0, len(card_jobs), GOLDFISH_CARD_BATCH_SIZE)]
+
+        pending_batch, pending_futures = None, None
+        for card_batch in card_batches + [None]:
+            futures = None
+            if card_batch is not None:
+                futures = [
+                    executor.submit(parse_price_file_columnar, file_path, cutoff_day, self.ledger_entry(card, finish, file_path))
+                    for card, finish, file_path in card_batch
+                ]
+
+            if pending_batch is not None:
+                yield pending_batch, [future.result() for future in pending_futures]
+
+            pending_batch, pending_futures = card_batch, futures
+
+
+
+
+
+
+
+    def process_card_batch(self, card_batch, parsed):
+        """
+        Build the new price documents of a batch of matched cards from their parsed
+        price files, looking up the coverage of the batch's new cards with one query.
+        Cards already looked up since the last insert keep their coverage, which
+        includes the documents that haven't been inserted yet.
+        card_batch is a list of (card, finish, file_path) tuples and parsed the
+        matching (file_path, dates, prices, errors, fingerprint) tuples.
+        Records every parsed file in the import ledger.
+        Returns the list of price documents to insert.
+        """
+        new_card_keys = {card.get("card_key") for card, _, _ in card_batch} - self.coverage_card_keys
+        if new_card_keys:
+            self.coverage.update(self.fetch_existing_coverage(new_card_keys))
+            self.coverage_card_keys.update(new_card_keys)
+
+        price_documents = []
+        for (card, finish, file_path), (_, dates, prices, errors, fingerprint) in zip(card_batch, parsed):
+            self.report_malformed_rows(file_path, errors)
+            ledger_entry = self.ledger_entry(card, finish, file_path)
+            if fingerprint:
+                self.record_imported_file(card, finish, file_path, fingerprint, dates, ledger_entry)
+
+            if len(dates) == 0:
+                if ledger_entry:
+                    logger.debug(f"No new price data in {file_path}")
+                else:
+                    logger.warning(f"No price data found in {file_path}")
+                continue
+
+            price_documents.extend(self.process_price_data(card, dates, prices, finish, self.coverage))
+
+        return price_documents
 
 
 
@@ -308,20 +699,22 @@ class GoldfishPriceImporter:
             logger.info("Parsing set manifests...")
             all_cards = self.parse_set_manifests()
 
-            # Process each card
+            # Load the cards to match against once, instead of querying per manifest card
+            logger.info("Building card index...")
+            self.build_card_index()
+
+            # Match each manifest card to a card in the db
             total_cards = len(all_cards)
             processed_cards = 0
             total_price_points = 0
             matched_card_keys = []
+            card_jobs = []
 
             logger.info(f"Starting to process {total_cards} cards")
 
             for goldfish_id, card_info in all_cards.items():
                 processed_cards += 1
 
-                if processed_cards % 100 == 0:
-                    logger.info(f"Processed {processed_cards}/{total_cards} cards")
-                
                 # Determine card key and finish
                 potential_card_key, finish = self.determine_card_key(card_info)
 
@@ -344,17 +737,44 @@ class GoldfishPriceImporter:
                     logger.warning(f"Price history file not found: {file_path}")
                     continue
 
-                price_data = self.parse_price_file(file_path)
+                card_jobs.append((card, finish, file_path))
 
-                if not price_data:
-                    logger.warning(f"No price data found in {file_path}")
-                    continue
+            logger.info(f"Matched {len(matched_card_keys)}/{total_cards} cards, importing {len(card_jobs)} price history files")
+
+            # Skip the files that haven't changed since they were last imported
+            self.load_import_ledger()
+            changed_jobs = [job for job in card_jobs if not self.is_unchanged(*job)]
+            if len(changed_jobs) < len(card_jobs):
+                logger.info(f"Skipping {len(card_jobs) - len(changed_jobs)} unchanged price history files")
+            card_jobs = changed_jobs
 
-                # Process and save price data
-                points_added = self.process_price_data(card, price_data, finish)
-                total_price_points += points_added
+            # Parse the files across all cores, then check coverage per batch of cards,
+            # inserting documents from many cards at once
+            pending_documents = []
+            processed_files = 0
+            self.clear_coverage()
+            with ProcessPoolExecutor(max_workers=GOLDFISH_PARSE_WORKERS) as executor:
+                for card_batch, parsed in self.iter_parsed_batches(card_jobs, executor):
+                    pending_documents.extend(self.process_card_batch(card_batch, parsed))
+
+                    if len(pending_documents) >= GOLDFISH_INSERT_BATCH_SIZE:
+                        total_price_points += self.insert_price_documents(pending_documents)
+                        pending_documents = []
+                        self.clear_coverage()
+
+                    processed_files += len(card_batch)
+                    logger.info(f"Processed {processed_files}/{len(card_jobs)} price history files")
+
+            if pending_documents:
+                total_price_points += self.insert_price_documents(pending_documents)
+
+            # Only move the ledger forward once everything it covers is in the db
+            if self.failed_insert_count:
+                logger.warning(f"{self.failed_insert_count} price documents failed to insert, not updating the import ledger")
+            else:
+                self.save_import_ledger()
             
-            logger.info(f"Import completed. Processed {processed_cards}, added {total_price_points} price points.")
+            logger.info(f"Import completed. Processed {processed_cards}, added {total_price_points} price points, rejected {self.malformed_row_count} malformed rows.")
 
             # update cards db to mark cards with goldfish history
             self.db[MONGO_COLLECTIONS["cards"]].update_many(
@@ -1,6 +1,6 @@
 from logger import get_logger
 from constants import *
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, DESCENDING
 
 
 logger = get_logger(__name__)
@@ -37,6 +37,7 @@ class DatabaseManager:
         """
         Set up collections and indexes needed for scryfall_daily_updater.py.
         This method ensures the database structure is properly configured.
+        Requires MongoDB 5.0 or newer (card_prices is a time series collection).
         """
         try:
             if not self.db:
@@ -56,6 +57,14 @@ class DatabaseManager:
                     }
                 )
                 logger.info(f"Created time series collection: {MONGO_COLLECTIONS['card_prices']}")
+
+            # Set and format price indices are a regular collection: they are upserted by
+            # (index, date), and time series collections only allow deletes and updates
+            # filtered on the metaField before MongoDB 7.0
+            price_indices_info = next(self.db.list_collections(filter={"name": MONGO_COLLECTIONS["price_indices"]}), None)
+            if price_indices_info and price_indices_info.get("type") == "timeseries":
+                logger.warning(f"{MONGO_COLLECTIONS['price_indices']} is a time series collection, which the daily updater "
+                               f"can't rewrite on MongoDB < 7.0; drop it so it is recreated as a regular collection")
             
             # 2. Set up indexes for the cards collection
             # Primary key is card_key for compatibility with scryfall_daily_updater
@@ -74,7 +83,60 @@ class DatabaseManager:
             self.db[MONGO_COLLECTIONS["cards"]].create_index([("legalities.modern", ASCENDING)])
             self.db[MONGO_COLLECTIONS["cards"]].create_index([("legalities.legacy", ASCENDING)])
             self.db[MONGO_COLLECTIONS["cards"]].create_index([("legalities.vintage", ASCENDING)])
+
+            # Legality bitmask (bits ordered as LEGALITY_FORMATS) for multi-format filters
+            self.db[MONGO_COLLECTIONS["cards"]].create_index([("legality_mask", ASCENDING)])
+
+            # Numeric price sort keys, so price-sorted search walks an index instead of converting prices
+            self.db[MONGO_COLLECTIONS["cards"]].create_index([("lowest_price", ASCENDING), ("name", ASCENDING)])
+            self.db[MONGO_COLLECTIONS["cards"]].create_index([("lowest_price", DESCENDING), ("name", ASCENDING)])
+            self.db[MONGO_COLLECTIONS["cards"]].create_index([("highest_price", ASCENDING), ("name", ASCENDING)])
+            self.db[MONGO_COLLECTIONS["cards"]].create_index([("highest_price", DESCENDING), ("name", ASCENDING)])
+
+            # 3. Ingestion ledger: one entry per Scryfall bulk file (type + updated_at)
+            self.db[MONGO_COLLECTIONS["ingestion_ledger"]].create_index(
+                [("bulk_type", ASCENDING), ("updated_at", ASCENDING)],
+                unique=True
+            )
+
+            # 4. Latest price per card_key + finish, maintained by scryfall_daily_updater
+            self.db[MONGO_COLLECTIONS["card_latest_prices"]].create_index(
+                [("card_key", ASCENDING), ("finish", ASCENDING)],
+                unique=True
+            )
+            
+            # 5. Rolling price statistics per card_key + finish
+            self.db[MONGO_COLLECTIONS["card_price_stats"]].create_index(
+                [("card_key", ASCENDING), ("finish", ASCENDING)],
+                unique=True
+            )
             
+            # Day lookups for building the top movers rankings
+            self.db[MONGO_COLLECTIONS["card_price_stats"]].create_index([("date", ASCENDING)])
+
+            # 6. Top movers rankings, one per format + finish + day
+            self.db[MONGO_COLLECTIONS["top_movers"]].create_index(
+                [("format", ASCENDING), ("finish", ASCENDING), ("date", DESCENDING)],
+                unique=True
+            )
+            
+            # Set and format price indices, one point per index per day
+            self.db[MONGO_COLLECTIONS["price_indices"]].create_index(
+                [("index.type", ASCENDING), ("index.key", ASCENDING), ("index.finish", ASCENDING), ("date", ASCENDING)],
+                unique=True
+            )
+            
+            # 7. Printing rollup per oracle card
+            self.db[MONGO_COLLECTIONS["oracle_rollup"]].create_index([("oracle_id", ASCENDING)], unique=True)
+            self.db[MONGO_COLLECTIONS["oracle_rollup"]].create_index([("name", ASCENDING)])
+
+            # 8. Goldfish import ledger, one entry per price history CSV keyed (_id) by its path
+            # relative to SET_DATA_DIR, so the default unique _id index is the only one needed.
+            # Created up front so the database counts as set up before the first Goldfish import
+            if MONGO_COLLECTIONS["goldfish_import_ledger"] not in collections:
+                self.db.create_collection(MONGO_COLLECTIONS["goldfish_import_ledger"])
+                logger.info(f"Created collection: {MONGO_COLLECTIONS['goldfish_import_ledger']}")
+
             logger.info("Database setup completed successfully.")
             return True
             
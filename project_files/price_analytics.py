@@ -0,0 +1,593 @@
+"""
+Price Analytics
+
+Derived price data maintained incrementally by the daily updater from each day's
+price points, so views over price movement don't have to scan `card_prices`.
+
+Rolling statistics: one `card_price_stats` document per card_key + finish holding
+the latest price, a short ring of recent daily prices (enough for the percentage
+change windows), min/max, and a running mean/variance (Welford). Each day's update
+reads only the previous stats document, so the cost is O(cards) per day no matter
+how much history has accumulated.
+
+Top movers: after each ingest, the day's stats documents are run through bounded
+heaps to rank the biggest gainers and losers per format and finish (with per-rarity
+rankings), stored as one `top_movers` document per format, finish and day.
+
+Price indices: in the same pass over the day's stats, the sum and median price of
+every set and format (per finish) are upserted as one point per index and day into
+`price_indices`.
+
+Oracle rollup: printings are grouped by `oracle_id` as the ingest runs, and each
+oracle card's printing count and cheapest/most expensive printing per finish are
+written to `oracle_rollup` at the end.
+
+Dense price series: when the updater stores prices as change points only, readers
+expand them back into one price per day with expand_price_changes. A price that
+disappeared is stored as a None change point, which ends the carried-forward series.
+"""
+from logger import get_logger
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+import heapq
+import math
+import statistics
+import pymongo
+from constants import *
+
+
+logger = get_logger(__name__)
+
+
+class RunningStats:
+    """
+    Running count, mean, variance (Welford) and min/max of a stream of prices.
+    """
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0,
+                 min_price: Optional[float] = None, max_price: Optional[float] = None) -> None:
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min_price = min_price
+        self.max_price = max_price
+        return
+
+    def add(self, price: float) -> None:
+        """Fold one price into the statistics."""
+        self.count += 1
+        delta = price - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (price - self.mean)
+        self.min_price = price if self.min_price is None else min(self.min_price, price)
+        self.max_price = price if self.max_price is None else max(self.max_price, price)
+
+    @property
+    def variance(self) -> Optional[float]:
+        """Sample variance, or None with fewer than two prices."""
+        if self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stddev(self) -> Optional[float]:
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min_price": self.min_price,
+            "max_price": self.max_price,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "RunningStats":
+        if not data:
+            return cls()
+        return cls(data.get("count", 0), data.get("mean", 0.0), data.get("m2", 0.0),
+                   data.get("min_price"), data.get("max_price"))
+
+
+def percent_change(old_price: Optional[float], new_price: Optional[float]) -> Optional[float]:
+    """Percentage change from old_price to new_price, or None if it isn't defined."""
+    if old_price is None or new_price is None or old_price == 0:
+        return None
+    return (new_price - old_price) / old_price * 100
+
+
+class PriceStatsUpdater:
+    """
+    Maintains the rolling per card_key + finish statistics in `card_price_stats`.
+    """
+    # Card fields copied onto the stats documents, so rankings over the stats can filter on them
+    CARD_FIELDS = ("name", "set", "rarity", "legality_mask")
+
+    def __init__(self, db, windows: Iterable[int] = PRICE_STATS_WINDOWS) -> None:
+        """
+        Args:
+            db: pymongo Database holding the stats collection
+            windows: Day windows to compute percentage changes over, e.g. (1, 7, 30)
+        """
+        self.db = db
+        self.windows = tuple(sorted(windows))
+        # Enough daily prices to look back over the longest window
+        self.history_length = self.windows[-1] + 1 if self.windows else 1
+        return
+
+    def roll_forward(self, stats_doc: Optional[Dict], card_key: str, finish: str, price: float, price_date: datetime,
+                     card_fields: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Compute the stats document after the price of price_date from the previous one.
+
+        Args:
+            stats_doc: The stored stats document, or None for a new card_key + finish
+            card_key: The card's key
+            finish: The price's finish
+            price: The day's price
+            price_date: The day of the price
+            card_fields: The card's CARD_FIELDS values, if known
+
+        Returns:
+            The new stats document, or None if price_date is older than the stored stats
+        """
+        if stats_doc and stats_doc["date"] > price_date:
+            return None
+
+        if stats_doc and stats_doc["date"] == price_date:
+            # Rerun of the same day: redo it from the stats as they were before that day
+            running = RunningStats.from_dict(stats_doc.get("prior"))
+            history = stats_doc.get("history", [])[:-1]
+        elif stats_doc:
+            running = RunningStats.from_dict(stats_doc)
+            history = stats_doc.get("history", [])
+        else:
+            running = RunningStats()
+            history = []
+
+        prior = running.to_dict()
+        running.add(price)
+        history = (history + [{"date": price_date, "price": price}])[-self.history_length:]
+
+        new_doc = {
+            "card_key": card_key,
+            "finish": finish,
+            **(card_fields or {}),
+            "date": price_date,
+            "price": price,
+            "history": history,
+            **running.to_dict(),
+            "stddev": running.stddev,
+            # Stats before price_date's price was added, so a rerun of the day doesn't count it twice
+            "prior": prior,
+            "updated_at": datetime.now(),
+        }
+
+        # Percentage change against the newest price at least `window` days old
+        for window in self.windows:
+            cutoff = price_date - timedelta(days=window)
+            old_price = next((point["price"] for point in reversed(history) if point["date"] <= cutoff), None)
+            new_doc[f"change_{window}d"] = percent_change(old_price, price)
+
+        return new_doc
+
+    def update(self, price_documents: List[Dict], card_documents: Optional[List[Dict]] = None) -> int:
+        """
+        Roll the stats of every card_key + finish in a batch of price points forward.
+
+        Args:
+            price_documents: Price entries, as built by DailyPriceUpdater.extract_price_data
+            card_documents: The batch's card documents, for the CARD_FIELDS copied onto the stats
+
+        Returns:
+            int: Number of stats documents written
+        """
+        if not price_documents:
+            return 0
+
+        collection = self.db[MONGO_COLLECTIONS["card_price_stats"]]
+
+        # One round-trip for the previous stats of the whole batch
+        card_keys = list({price_document["card_key"] for price_document in price_documents})
+        existing = {
+            (doc["card_key"], doc["finish"]): doc
+            for doc in collection.find({"card_key": {"$in": card_keys}}, {"_id": 0})
+        }
+
+        card_fields = {
+            card_document["card_key"]: {field: card_document.get(field) for field in self.CARD_FIELDS}
+            for card_document in card_documents or []
+        }
+
+        operations = []
+        for price_document in price_documents:
+            key = (price_document["card_key"], price_document["finish"])
+            new_doc = self.roll_forward(existing.get(key), key[0], key[1], price_document["price"], price_document["date"],
+                                        card_fields.get(key[0]))
+            if new_doc is None:
+                continue
+            existing[key] = new_doc
+            operations.append(pymongo.ReplaceOne({"card_key": key[0], "finish": key[1]}, new_doc, upsert=True))
+
+        batch_size = 500
+        for j in range(0, len(operations), batch_size):
+            collection.bulk_write(operations[j:j+batch_size], ordered=False)
+        return len(operations)
+
+
+class TopMoversBuilder:
+    """
+    Ranks the day's biggest percentage gainers and losers per format and finish using
+    bounded min-heaps, so ranking N card finishes costs O(N log K) and O(K) memory per
+    ranking. Each format + finish also keeps a ranking per rarity.
+    """
+    def __init__(self, top_k: int = TOP_MOVERS_COUNT, window: int = 1, min_price: float = TOP_MOVERS_MIN_PRICE) -> None:
+        """
+        Args:
+            top_k: Number of gainers and losers kept per ranking
+            window: Which change_<window>d stats field to rank on
+            min_price: Cards cheaper than this are left out, so cent-level moves don't swamp the rankings
+        """
+        self.top_k = top_k
+        self.change_field = f"change_{window}d"
+        self.min_price = min_price
+        # (format, finish, rarity, "gainers"|"losers") -> heap of (score, card_key, entry)
+        self.heaps = {}
+        return
+
+    def _push(self, heap_key: tuple, score: float, entry: Dict) -> None:
+        heap = self.heaps.setdefault(heap_key, [])
+        item = (score, entry["card_key"], entry)
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+
+    def add(self, stats_doc: Dict) -> None:
+        """Rank one card_price_stats document."""
+        change = stats_doc.get(self.change_field)
+        if change is None or stats_doc.get("price") is None or stats_doc["price"] < self.min_price:
+            return
+
+        entry = {
+            "card_key": stats_doc["card_key"],
+            "name": stats_doc.get("name"),
+            "set": stats_doc.get("set"),
+            "rarity": stats_doc.get("rarity"),
+            "price": stats_doc["price"],
+            "change": change,
+        }
+
+        legality_mask = stats_doc.get("legality_mask") or 0
+        formats = ["all"] + [format_name for bit, format_name in enumerate(LEGALITY_FORMATS) if legality_mask & (1 << bit)]
+        rarities = ["all"] + ([entry["rarity"]] if entry["rarity"] else [])
+        finish = stats_doc["finish"]
+
+        for format_name in formats:
+            for rarity in rarities:
+                if change > 0:
+                    self._push((format_name, finish, rarity, "gainers"), change, entry)
+                elif change < 0:
+                    self._push((format_name, finish, rarity, "losers"), -change, entry)
+
+    def documents(self, price_date: datetime) -> List[Dict]:
+        """
+        Returns:
+            One top_movers document per format + finish for price_date, each holding
+            `gainers` and `losers` rankings keyed by rarity ("all" for every rarity)
+        """
+        documents = {}
+        for (format_name, finish, rarity, direction), heap in self.heaps.items():
+            document = documents.setdefault((format_name, finish), {
+                "date": price_date,
+                "format": format_name,
+                "finish": finish,
+                "gainers": {},
+                "losers": {},
+                "updated_at": datetime.now(),
+            })
+            document[direction][rarity] = [entry for _, _, entry in sorted(heap, key=lambda item: item[:2], reverse=True)]
+        return list(documents.values())
+
+    def write(self, db, price_date: datetime) -> int:
+        """
+        Replace price_date's top_movers documents with the current rankings.
+
+        Args:
+            db: pymongo Database holding the top movers collection
+            price_date: The ranked day
+
+        Returns:
+            int: Number of top_movers documents written
+        """
+        documents = self.documents(price_date)
+        operations = [
+            pymongo.ReplaceOne({"format": document["format"], "finish": document["finish"], "date": price_date}, document, upsert=True)
+            for document in documents
+        ]
+        if operations:
+            db[MONGO_COLLECTIONS["top_movers"]].bulk_write(operations, ordered=False)
+        return len(operations)
+
+
+class PriceIndexBuilder:
+    """
+    Builds the day's price indices: for every set and every format, the card count,
+    sum and median of the prices of its cards, per finish.
+    """
+    def __init__(self) -> None:
+        # (index type, key, finish) -> list of the day's prices
+        self.prices = {}
+        return
+
+    def add(self, stats_doc: Dict) -> None:
+        """Add one card_price_stats document's price to its set and format indices."""
+        price = stats_doc.get("price")
+        if price is None:
+            return
+
+        finish = stats_doc["finish"]
+        if stats_doc.get("set"):
+            self.prices.setdefault(("set", stats_doc["set"], finish), []).append(price)
+
+        legality_mask = stats_doc.get("legality_mask") or 0
+        for bit, format_name in enumerate(LEGALITY_FORMATS):
+            if legality_mask & (1 << bit):
+                self.prices.setdefault(("format", format_name, finish), []).append(price)
+
+    def documents(self, price_date: datetime) -> List[Dict]:
+        """
+        Returns:
+            One price_indices point per set/format + finish for price_date
+        """
+        documents = []
+        for (index_type, key, finish), prices in self.prices.items():
+            documents.append({
+                "date": price_date,
+                "index": {"type": index_type, "key": key, "finish": finish},
+                "card_count": len(prices),
+                "sum": sum(prices),
+                "median": statistics.median(prices),
+            })
+        return documents
+
+    def write(self, db, price_date: datetime) -> int:
+        """
+        Upsert price_date's point of every index into price_indices, keyed by
+        (index, date), so a rerun of the day replaces its points rather than adding a
+        second set.
+
+        Args:
+            db: pymongo Database holding the price indices collection
+            price_date: The indexed day
+
+        Returns:
+            int: Number of index points written
+        """
+        operations = [
+            pymongo.ReplaceOne(
+                {"index.type": document["index"]["type"], "index.key": document["index"]["key"],
+                 "index.finish": document["index"]["finish"], "date": price_date},
+                document,
+                upsert=True
+            )
+            for document in self.documents(price_date)
+        ]
+        batch_size = 500
+        for j in range(0, len(operations), batch_size):
+            db[MONGO_COLLECTIONS["price_indices"]].bulk_write(operations[j:j+batch_size], ordered=False)
+        return len(operations)
+
+
+class OracleRollupBuilder:
+    """
+    Rolls printings up to their oracle card: for every oracle_id, the number of
+    printings and the cheapest and most expensive printing per finish. Printings are
+    collected per card_key while the ingest runs (a later copy of a printing replaces
+    the earlier one), so builders from several shards can be merged.
+    """
+    # Scryfall price field of each finish
+    FINISH_PRICE_FIELDS = {"nonfoil": "usd", "foil": "usd_foil", "etched": "usd_etched"}
+
+    def __init__(self) -> None:
+        # oracle_id -> card_key -> {"name", "set", "prices": {finish: price}}
+        self.printings = {}
+        return
+
+    @staticmethod
+    def oracle_id_of(card_document: Dict) -> Optional[str]:
+        """A card's oracle_id; reversible cards only carry it on their faces."""
+        if card_document.get("oracle_id"):
+            return card_document["oracle_id"]
+        for face in card_document.get("card_faces") or []:
+            if face.get("oracle_id"):
+                return face["oracle_id"]
+        return None
+
+    def add_card(self, card_document: Dict) -> None:
+        """Record one printing (a card document, or a stored card) and its current prices."""
+        oracle_id = self.oracle_id_of(card_document)
+        if not oracle_id:
+            return
+
+        prices = card_document.get("prices") or {}
+        finish_prices = {}
+        for finish, price_field in self.FINISH_PRICE_FIELDS.items():
+            try:
+                if prices.get(price_field) not in (None, 'null'):
+                    finish_prices[finish] = float(prices[price_field])
+            except (ValueError, TypeError):
+                continue
+
+        self.printings.setdefault(oracle_id, {})[card_document["card_key"]] = {
+            "name": card_document.get("name"),
+            "set": card_document.get("set"),
+            "prices": finish_prices,
+        }
+
+    def merge(self, other: "OracleRollupBuilder") -> None:
+        """Fold the printings collected by another builder into this one."""
+        for oracle_id, printings in other.printings.items():
+            self.printings.setdefault(oracle_id, {}).update(printings)
+
+    def documents(self) -> List[Dict]:
+        """
+        Returns:
+            One oracle_rollup document per oracle_id
+        """
+        documents = []
+        for oracle_id, printings in self.printings.items():
+            cheapest = {}
+            most_expensive = {}
+            for card_key, printing in printings.items():
+                for finish, price in printing["prices"].items():
+                    entry = {"card_key": card_key, "set": printing["set"], "price": price}
+                    if finish not in cheapest or price < cheapest[finish]["price"]:
+                        cheapest[finish] = entry
+                    if finish not in most_expensive or price > most_expensive[finish]["price"]:
+                        most_expensive[finish] = entry
+
+            documents.append({
+                "oracle_id": oracle_id,
+                "name": next(iter(printings.values()))["name"],
+                "printing_count": len(printings),
+                "cheapest": cheapest,
+                "most_expensive": most_expensive,
+                "updated_at": datetime.now(),
+            })
+        return documents
+
+    def write(self, db) -> int:
+        """
+        Upsert the oracle_rollup document of every oracle_id seen.
+
+        Args:
+            db: pymongo Database holding the oracle rollup collection
+
+        Returns:
+            int: Number of oracle_rollup documents written
+        """
+        operations = [
+            pymongo.ReplaceOne({"oracle_id": document["oracle_id"]}, document, upsert=True)
+            for document in self.documents()
+        ]
+        batch_size = 500
+        for j in range(0, len(operations), batch_size):
+            db[MONGO_COLLECTIONS["oracle_rollup"]].bulk_write(operations[j:j+batch_size], ordered=False)
+        return len(operations)
+
+
+def build_daily_analytics(db, price_date: datetime, builders: List) -> Dict[str, int]:
+    """
+    Feed every card_price_stats document of price_date through the given builders in
+    a single pass, then have each write its results.
+
+    Args:
+        db: pymongo Database holding the stats and output collections
+        price_date: The day to build analytics for
+        builders: Builders with add(stats_doc) and write(db, price_date) methods
+
+    Returns:
+        Dict of builder class name -> number of documents it wrote
+    """
+    # The history ring and prior stats aren't needed for the daily rollups
+    projection = {"_id": 0, "history": 0, "prior": 0}
+    for stats_doc in db[MONGO_COLLECTIONS["card_price_stats"]].find({"date": price_date}, projection):
+        for builder in builders:
+            builder.add(stats_doc)
+
+    return {type(builder).__name__: builder.write(db, price_date) for builder in builders}
+
+
+def expand_price_changes(change_points: List[Dict], start_date: datetime, end_date: datetime,
+                         last_day: Optional[datetime] = None) -> List[Dict]:
+    """
+    Expand price change points (as stored in change-only mode) into a dense daily
+    series, carrying each price forward until the next change. A None change point
+    (the price disappeared) leaves the following days out. Already dense series
+    come back unchanged.
+
+    Args:
+        change_points: Price entries of one card_key + finish with "date" and "price",
+            including the last one on or before start_date if the series should start there
+        start_date: First day of the series
+        end_date: Last day of the series
+        last_day: Last day prices were ingested (see last_ingested_price_date); the
+            series isn't carried past it, since nothing is known about later days
+
+    Returns:
+        List of {"date", "price"} dicts, one per day with a known price from start_date
+        to end_date (or last_day, if earlier)
+    """
+    points = sorted(change_points, key=lambda point: point["date"])
+    start_day = datetime.combine(start_date.date(), datetime.min.time())
+    end_day = datetime.combine(end_date.date(), datetime.min.time())
+    if last_day is not None:
+        end_day = min(end_day, datetime.combine(last_day.date(), datetime.min.time()))
+
+    series = []
+    index = 0
+    current_price = None
+    day = start_day
+    while day <= end_day:
+        while index < len(points) and points[index]["date"] < day + timedelta(days=1):
+            current_price = points[index]["price"]
+            index += 1
+        if current_price is not None:
+            series.append({"date": day, "price": current_price})
+        day += timedelta(days=1)
+    return series
+
+
+def last_ingested_price_date(db) -> Optional[datetime]:
+    """
+    The price date of the most recent completed daily ingest, from the ingestion ledger
+    (the daily updater records the date it stamped the prices with, which is the day the
+    run started rather than the day it completed).
+
+    Args:
+        db: pymongo Database holding the ingestion ledger
+
+    Returns:
+        Midnight of that day, or None if no daily ingest has completed
+    """
+    entries = list(
+        db[MONGO_COLLECTIONS["ingestion_ledger"]]
+        .find({"status": "complete", "bulk_type": {"$ne": "backfill"}}, {"_id": 0, "completed_at": 1, "price_date": 1})
+        .sort("completed_at", pymongo.DESCENDING).limit(1)
+    )
+    if not entries:
+        return None
+    # Entries recorded before the price date was stored only have their completion time
+    price_date = entries[0].get("price_date") or entries[0].get("completed_at")
+    if not price_date:
+        return None
+    return datetime.combine(price_date.date(), datetime.min.time())
+
+
+def load_dense_price_history(db, card_key: str, finish: str, start_date: datetime, end_date: datetime) -> List[Dict]:
+    """
+    Read one card finish's daily price series between two dates from card_prices,
+    whether it was stored daily or as change points.
+
+    Args:
+        db: pymongo Database holding the card_prices collection
+        card_key: The card's key
+        finish: The finish to read
+        start_date: First day of the series
+        end_date: Last day of the series
+
+    Returns:
+        List of {"date", "price"} dicts, one per day
+    """
+    prices = db[MONGO_COLLECTIONS["card_prices"]]
+    projection = {"_id": 0, "date": 1, "price": 1}
+
+    # The change in effect at start_date may have been stored before it
+    earlier = list(
+        prices.find({"card_key": card_key, "finish": finish, "date": {"$lte": start_date}}, projection)
+        .sort("date", pymongo.DESCENDING).limit(1)
+    )
+    in_range = list(prices.find({"card_key": card_key, "finish": finish, "date": {"$gt": start_date, "$lte": end_date}}, projection))
+    return expand_price_changes(earlier + in_range, start_date, end_date, last_ingested_price_date(db))
@@ -5,26 +5,246 @@ This module handles the daily collection of card prices from Scryfall's
 bulk data API.
 """
 from logger import get_logger, get_changelog_logger
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+import logging
+import gzip
+import hashlib
 import json
+import queue
+import shutil
+import threading
+import time
+import zlib
 import pymongo
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import requests
 from pathlib import Path
+from bulk_archive import BulkSnapshotArchive
+from price_analytics import OracleRollupBuilder, PriceIndexBuilder, PriceStatsUpdater, TopMoversBuilder, build_daily_analytics
+from bulk_data_reader import compressed_bulk_suffix, iter_bulk_cards, iter_json_lines, open_bulk_file
 from constants import *
 
 
 logger = get_logger(__name__)
 
 
+# Sentinel passed down a pipeline queue once the upstream stage has finished
+_PIPELINE_DONE = object()
+
+
+def _put_unless_stopped(out_queue: queue.Queue, item, stop_event: threading.Event) -> bool:
+    """
+    Put an item on a bounded pipeline queue, blocking while it is full, but give up
+    if the pipeline is being torn down.
+    
+    Returns:
+        bool: True if the item was queued, False if the pipeline was stopped
+    """
+    while not stop_event.is_set():
+        try:
+            out_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get_unless_stopped(in_queue: queue.Queue, stop_event: threading.Event):
+    """
+    Get the next item from a pipeline queue, blocking while it is empty, but give up
+    if the pipeline is being torn down.
+    
+    Returns:
+        The next queued item, or None if the pipeline was stopped
+    """
+    while True:
+        try:
+            return in_queue.get(timeout=0.1)
+        except queue.Empty:
+            if stop_event.is_set():
+                return None
+
+
+class PipelineStageStats:
+    """
+    Throughput counters for one stage of the daily update pipeline. Only time spent
+    doing the stage's own work is counted, not time blocked on its queues.
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.card_count = 0
+        self.busy_seconds = 0.0
+
+    def record(self, card_count: int, seconds: float) -> None:
+        """Record a processed batch of card_count cards that took `seconds` of work."""
+        self.card_count += card_count
+        self.busy_seconds += seconds
+
+    @property
+    def cards_per_second(self) -> float:
+        return self.card_count / self.busy_seconds if self.busy_seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return f"Pipeline stage '{self.name}': {self.card_count} cards in {self.busy_seconds:.2f}s ({self.cards_per_second:.0f} cards/sec)"
+
+
+class _PipelineThread(threading.Thread):
+    """
+    Thread running one pipeline stage. Any exception is kept on `error` and stops the
+    rest of the pipeline; the downstream queue always gets the done sentinel.
+    """
+    def __init__(self, name, target, args, done_queue: queue.Queue, stop_event: threading.Event) -> None:
+        super().__init__(name=name, daemon=True)
+        self._stage_target = target
+        self._stage_args = args
+        self._done_queue = done_queue
+        self._stop_event = stop_event
+        self.error = None
+
+    def run(self) -> None:
+        try:
+            self._stage_target(*self._stage_args)
+        except Exception as e:
+            logger.error(f"Pipeline stage {self.name} failed: {e}")
+            self.error = e
+            self._stop_event.set()
+        finally:
+            _put_unless_stopped(self._done_queue, _PIPELINE_DONE, self._stop_event)
+
+
+class _ChangelogBuffer(logging.Handler):
+    """
+    Log handler collecting changelog messages in memory. Shard workers log their
+    changelog entries here so the parent process can merge them into the real changelog.
+    """
+    def __init__(self) -> None:
+        super().__init__(level=logging.INFO)
+        self.lines = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(record.getMessage())
+
+
+def _run_ingest_shard(updater_kwargs: Dict, bulk_info: Dict, partition_path: str, shard_index: int, shard_count: int,
+                      price_date: datetime) -> Dict:
+    """
+    Worker process entry point for a sharded ingest: runs the pipeline over the cards
+    of one shard (its JSON lines partition of the bulk file) with its own MongoClient,
+    and returns its stats and change tracking results for the parent to merge.
+    """
+    updater = DailyPriceUpdater(**updater_kwargs)
+    updater.shard_index = shard_index
+    updater.shard_count = shard_count
+    updater.price_date = price_date
+
+    # Capture changelog entries instead of writing them from several processes at once
+    changelog_buffer = _ChangelogBuffer()
+    updater.changelog_logger = logging.getLogger(f"mtg_changelog.shard{shard_index}")
+    updater.changelog_logger.setLevel(logging.INFO)
+    updater.changelog_logger.propagate = False
+    for handler in updater.changelog_logger.handlers[:]:
+        updater.changelog_logger.removeHandler(handler)
+    updater.changelog_logger.addHandler(changelog_buffer)
+
+    updater.connect_to_db()
+    if updater.db is None:
+        raise RuntimeError(f"Shard {shard_index} could not connect to MongoDB")
+    try:
+        counts = updater._ingest_bulk_file(bulk_info, Path(partition_path), cards=iter_json_lines(Path(partition_path)))
+    finally:
+        updater.close_connection()
+
+    return {
+        "counts": counts,
+        "changes_detected": updater.changes_detected,
+        "new_sets": updater.new_sets,
+        "ban_restricted_changes": updater.ban_restricted_changes,
+        "errata_changes": updater.errata_changes,
+        "changelog_lines": changelog_buffer.lines,
+        "oracle_rollup": updater.oracle_rollup,
+    }
+
+
 class DailyPriceUpdater:
     """
     Class to handle daily price updates using Scryfall's bulk data API.
     """
-    def __init__(self, mongo_uri=MONGO_URI, db_name=MONGO_DB_NAME, format_name="all") -> None:
+    # Fields of existing card documents needed by track_significant_changes
+    CHANGE_TRACKING_PROJECTION = {
+        "_id": 0,
+        "card_key": 1,
+        "set": 1,
+        "legalities": 1,
+        "oracle_text": 1,
+        "type_line": 1,
+        "mana_cost": 1,
+        "content_hash": 1,
+    }
+
+    # Scryfall fields that change from day to day without the card itself changing
+    # (prices and the EDHREC/Penny Dreadful popularity ranks), plus the sort keys derived
+    # from them. These are left out of the content hash and are the only fields rewritten
+    # (along with updated_at) when a card's content hash is unchanged
+    VOLATILE_CARD_FIELDS = ("prices", "edhrec_rank", "penny_rank", "lowest_price", "highest_price")
+
+    # Scryfall price fields considered for the lowest_price/highest_price sort keys
+    SORT_PRICE_FIELDS = ("usd", "usd_foil", "usd_etched")
+
+    # Bump whenever create_card_data_document starts deriving new fields, so every
+    # stored card gets one full rewrite instead of a prices-only update
+    CONTENT_HASH_VERSION = 3
+
+    def __init__(self, mongo_uri=MONGO_URI, db_name=MONGO_DB_NAME, format_name="all", stream_bulk_data=True,
+                 batch_size=UPDATE_BATCH_SIZE, read_queue_size=PIPELINE_READ_QUEUE_SIZE, write_queue_size=PIPELINE_WRITE_QUEUE_SIZE,
+                 archive_bulk_data=ARCHIVE_BULK_DATA, worker_count=INGEST_WORKER_COUNT, formats: Optional[Iterable[str]] = None,
+                 price_changes_only=PRICE_CHANGES_ONLY) -> None:
         self.mongo_uri = mongo_uri
         self.db_name = db_name
         self.format_name = format_name.lower()
+
+        # Formats to ingest in this run; a card is included if it is legal in any of them.
+        # Defaults to just format_name. "all" (or no formats) includes every paper card
+        self.formats = {f.lower() for f in formats} if formats else {self.format_name}
+        self.format_mask = 0 if 'all' in self.formats else self.formats_to_mask(self.formats)
+
+        # When True, the bulk file is decoded one card at a time instead of with json.load,
+        # which keeps memory flat regardless of bulk file size (e.g. for `all_cards`)
+        self.stream_bulk_data = stream_bulk_data
+
+        # Pipeline sizing: cards per batch, and how many batches may wait between stages
+        self.batch_size = batch_size
+        self.read_queue_size = read_queue_size
+        self.write_queue_size = write_queue_size
+        self._write_executor = None
+
+        # Rolling per card_key + finish price statistics, created once connected
+        self.price_stats = None
+
+        # Printings grouped by oracle_id over the run, written to oracle_rollup at the end
+        self.oracle_rollup = OracleRollupBuilder()
+
+        # When True, card_prices only gets a point when a card's price differs from the last
+        # stored one (run-length storage); expand_price_changes turns it back into a daily series
+        self.price_changes_only = price_changes_only
+        self.stored_prices = {}
+
+        # Change-only mode bookkeeping for prices that disappear: the card_key + finish pairs
+        # that got a price this run, and card_keys whose prices this run doesn't decide
+        # (excluded by the format filter, or committed before the run was resumed)
+        self.seen_price_keys = set()
+        self.untracked_card_keys = set()
+
+        # Number of processes to shard the ingest across (1 = ingest in this process).
+        # shard_index/shard_count are set on the updaters running inside the worker processes
+        self.worker_count = max(1, worker_count)
+        self.shard_index = 0
+        self.shard_count = 1
+
+        # Day the run's prices are stamped with, fixed when the ingest begins so a run
+        # that crosses midnight stamps (and records in the ledger) a single date
+        self.price_date = None
+
         self.client = None
         self.db = None
         self.session = requests.Session()
@@ -34,6 +254,11 @@ class DailyPriceUpdater:
         self.cache_dir = DATA_DIR / "scryfall_bulk_daily"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
+        # When True, every downloaded bulk file is also added to the delta-encoded
+        # snapshot archive, so past days can be rebuilt after the cache drops them
+        self.archive_bulk_data = archive_bulk_data
+        self.archive_dir = SCRYFALL_BULK_ARCHIVE_DIR
+
         # Set up a separate changelog logger
         self.changelog_dir = DATA_DIR / "changelogs"
         self.changelog_dir.mkdir(parents=True, exist_ok=True)
@@ -44,9 +269,14 @@ class DailyPriceUpdater:
         self.ban_restricted_changes = []
         self.format_changes = []
         self.errata_changes = []
+
+        # Set codes already present in the cards collection, used for NEW SET detection.
+        # Loaded once per run by _load_known_set_codes and extended as new sets are ingested
+        self.known_set_codes = set()
         
-        # Set up the changelog logger
-        self.setup_changelog_logger()
+        # Get the changelog logger; the session header is written by setup_changelog_logger
+        # once there is actually something to ingest, so no-op polling runs leave no trace
+        self.changelog_logger = get_changelog_logger()
         return
 
     ## DB CONNECTION METHODS ##
@@ -106,14 +336,129 @@ class DailyPriceUpdater:
             return None
 
 
-    def _download_bulk_data(self, bulk_info: Dict, download_chunk_size=8192) -> Optional[Path]:
+    def _download_meta_path(self, data_type: str) -> Path:
+        """Path of the sidecar file recording the state of the latest download of data_type."""
+        return self.cache_dir / f"{data_type}.download.json"
+
+    def _load_download_meta(self, data_type: str) -> Dict:
+        """
+        Load the download state for a bulk data type (validators, encoding, completion).
+        Returns an empty dict if there is none or it can't be read.
+        """
+        meta_path = self._download_meta_path(data_type)
+        if not meta_path.exists():
+            return {}
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable download metadata {meta_path.name}: {e}")
+            return {}
+
+    def _save_download_meta(self, data_type: str, meta: Dict) -> None:
+        """Persist the download state for a bulk data type, forgetting validations of deleted files."""
+        if meta.get('validated'):
+            meta['validated'] = {path: entry for path, entry in meta['validated'].items() if Path(path).exists()}
+        with open(self._download_meta_path(data_type), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+    @staticmethod
+    def _recorded_validation(meta: Dict, file_path: Path) -> Optional[Dict]:
+        """
+        The validation recorded in the download metadata for file_path, if the file still
+        has the size and mtime it had when it was validated.
+        """
+        entry = meta.get('validated', {}).get(str(file_path))
+        if not entry or not file_path.exists():
+            return None
+        stat = file_path.stat()
+        if stat.st_size != entry['size'] or stat.st_mtime_ns != entry['mtime_ns']:
+            return None
+        return entry
+
+    def _is_valid_bulk_file(self, file_path: Path, expected_size: Optional[int], meta: Optional[Dict] = None) -> bool:
+        """
+        Check that a cached bulk data file is complete: its decompressed size matches
+        the size advertised in the bulk-data metadata (when given) and the top-level
+        JSON array is closed, which catches files truncated by an interrupted download.
+        Compressed files are checked by streaming through them, so memory stays flat.
+
+        When the download metadata is given, a passing check is recorded in it together
+        with the file's size and mtime, and a recorded file is trusted without reading it
+        again until either of those changes (the caller saves the metadata).
+        
+        Args:
+            file_path: Path to the cached bulk data file (.json, .json.gz or .json.zst)
+            expected_size: Decompressed size in bytes from the bulk-data metadata, if any
+            meta: Download metadata from _load_download_meta, to record the result in
+            
+        Returns:
+            bool: True if the file looks complete
+        """
+        if not file_path.exists() or file_path.stat().st_size == 0:
+            return False
+
+        recorded = self._recorded_validation(meta, file_path) if meta is not None else None
+        if recorded:
+            if expected_size and recorded['decompressed_size'] != expected_size:
+                logger.warning(f"Bulk data file {file_path.name} is {recorded['decompressed_size']} bytes, expected {expected_size}")
+                return False
+            return True
+
+        file_size = 0
+        tail = b''
+        try:
+            with open_bulk_file(file_path, 'rb') as f:
+                while True:
+                    chunk = f.read(BULK_DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    file_size += len(chunk)
+                    tail = (tail + chunk)[-64:]
+        except Exception as e:
+            logger.warning(f"Bulk data file {file_path.name} could not be read back: {e}")
+            return False
+
+        if file_size == 0:
+            return False
+        if expected_size and file_size != expected_size:
+            logger.warning(f"Bulk data file {file_path.name} is {file_size} bytes, expected {expected_size}")
+            return False
+
+        # The last non-whitespace byte of a complete file closes the card array
+        tail = tail.rstrip()
+        if not tail.endswith(b']'):
+            logger.warning(f"Bulk data file {file_path.name} does not end with a closed JSON array")
+            return False
+
+        if meta is not None:
+            stat = file_path.stat()
+            meta.setdefault('validated', {})[str(file_path)] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'decompressed_size': file_size,
+            }
+        return True
+
+    def _download_bulk_data(self, bulk_info: Dict, download_chunk_size=BULK_DOWNLOAD_CHUNK_SIZE) -> Optional[Path]:
         """
         Downloads the bulk data specified in the bulk_info and saves it to the cache. Since
         this method queries the web, it shouldn't be called directly--use the run method instead
 
+        Downloads land in a `.part` file holding the bytes exactly as transferred, so an
+        interrupted download is resumed with an HTTP Range request instead of starting over.
+        The finished file is validated against the size in the bulk-data metadata before it
+        is used; the validation is recorded in the download metadata, so a cache hit only
+        reads the file again if its size or mtime changed. When the previous download came
+        from the same URL and is still cached, the request is made conditional
+        (If-None-Match/If-Modified-Since) so an unchanged file costs a 304.
+
+        The cache is kept compressed (zstd if available, gzip otherwise); when Scryfall sends
+        the file gzip-encoded and zstd isn't available, the transferred bytes are kept as-is.
+
         Args:
             bulk_info: Dict with bulk data info from _get_latest_bulk_data_info()
-            download_chunk_size: Chunk size for download (default: 8192)--larger powers of 2 might improve performance on higher-end machines
+            download_chunk_size: Chunk size for download (default: BULK_DOWNLOAD_CHUNK_SIZE)
             
         Returns:
             Path to the downloaded file or None if error
@@ -127,52 +472,189 @@ class DailyPriceUpdater:
         # change special characters to fit our existing datetime format
         timestamp = bulk_info.get('updated_at', '').replace(':', '-').replace('+', '-')
         data_type = bulk_info.get('type', 'default_cards')
+        expected_size = bulk_info.get('size')
 
 
         # create cache filename based on timestamp to ensure no collisions
         filename = f"{bulk_info.get('type')}-{timestamp}.json"
-        output_path = self.cache_dir / filename
+        base_path = self.cache_dir / filename
+        output_path = base_path.with_name(base_path.name + compressed_bulk_suffix())
+        part_path = base_path.with_name(base_path.name + ".part")
 
-        # Check for existing downloaded file
-        if output_path.exists() and output_path.stat().st_size > 0:
-            logger.info(f"Using cached bulk data file at: {output_path}")
-            return output_path
+        meta = self._load_download_meta(data_type)
+
+        # Check for an existing downloaded file, in any of the formats we may have cached it as
+        for cached_path in (base_path.with_name(base_path.name + suffix) for suffix in (".zst", ".gz", "")):
+            if not cached_path.exists():
+                continue
+            if self._is_valid_bulk_file(cached_path, expected_size, meta):
+                self._save_download_meta(data_type, meta)
+                logger.info(f"Using cached bulk data file at: {cached_path}")
+                return cached_path
+            logger.warning(f"Cached bulk data file {cached_path.name} failed validation, downloading it again")
+            cached_path.unlink()
         
+        headers = {'Accept-Encoding': 'gzip'}
+
+        resume_from = part_path.stat().st_size if part_path.exists() else 0
+        if resume_from and meta.get('part_path') == str(part_path) and not meta.get('complete'):
+            # Resume the interrupted download; If-Range makes the server send the whole
+            # file again if it changed since the partial download started
+            headers['Range'] = f"bytes={resume_from}-"
+            if meta.get('etag'):
+                headers['If-Range'] = meta['etag']
+        else:
+            if part_path.exists():
+                part_path.unlink()
+            resume_from = 0
+
+            # Previous complete download from this URL still on disk unchanged: ask if it changed.
+            # Scryfall's download URIs are timestamped, so the stored validators only apply to the same URI
+            previous_path = Path(meta['path']) if meta.get('complete') and meta.get('path') else None
+            if previous_path and meta.get('download_uri') == download_uri and self._recorded_validation(meta, previous_path):
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
 
-        # clean up older files of the same kind before downloading new ones
-        self._cleanup_old_bulk_files(data_type, output_path)
         # Download the file
         try:
             logger.info(f"Downloading bulk data from {download_uri}...")
-            response = self.session.get(download_uri, stream=True)
+            response = self.session.get(download_uri, stream=True, headers=headers)
+
+            if response.status_code == 304:
+                logger.info(f"Bulk data unchanged since last download, using cached file at: {meta['path']}")
+                return Path(meta['path'])
+
+            if response.status_code == 416:
+                # Our partial file is not a prefix the server recognises; start from scratch next time
+                logger.warning("Server rejected resume range, discarding partial download")
+                part_path.unlink(missing_ok=True)
+                return None
+
             response.raise_for_status()
 
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=download_chunk_size):
+            if response.status_code == 206:
+                logger.info(f"Resuming bulk data download at byte {resume_from}")
+                write_mode = 'ab'
+                transfer_size = self._parse_content_range_total(response.headers.get('Content-Range'))
+            else:
+                write_mode = 'wb'
+                transfer_size = int(response.headers['Content-Length']) if response.headers.get('Content-Length') else None
+
+            # Record validators before writing so a resumed download can check it's the same file
+            meta = {
+                'path': str(output_path),
+                'part_path': str(part_path),
+                'download_uri': download_uri,
+                'updated_at': bulk_info.get('updated_at'),
+                'etag': response.headers.get('ETag', meta.get('etag') if write_mode == 'ab' else None),
+                'last_modified': response.headers.get('Last-Modified', meta.get('last_modified') if write_mode == 'ab' else None),
+                'content_encoding': response.headers.get('Content-Encoding', meta.get('content_encoding') if write_mode == 'ab' else None),
+                'complete': False,
+                'validated': meta.get('validated', {}),
+            }
+            self._save_download_meta(data_type, meta)
+
+            # Write the bytes as transferred (still content-encoded) so byte ranges stay valid for resuming
+            with open(part_path, write_mode) as f:
+                for chunk in response.raw.stream(download_chunk_size, decode_content=False):
                     f.write(chunk)
 
+            part_size = part_path.stat().st_size
+            if transfer_size is not None and part_size != transfer_size:
+                logger.error(f"Bulk data download incomplete ({part_size}/{transfer_size} bytes), will resume on next run")
+                return None
+
+            # Turn the transfer into the compressed cache file
+            if meta['content_encoding'] == 'gzip' and output_path.suffix == ".gz":
+                # Already gzip, keep the bytes exactly as downloaded
+                part_path.replace(output_path)
+            else:
+                source_opener = gzip.open if meta['content_encoding'] == 'gzip' else open
+                with source_opener(part_path, 'rb') as src, open_bulk_file(output_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, download_chunk_size)
+                part_path.unlink()
+
+            if not self._is_valid_bulk_file(output_path, expected_size, meta):
+                logger.error(f"Downloaded bulk data failed validation, discarding {output_path.name}")
+                output_path.unlink()
+                return None
+
+            meta['complete'] = True
+            self._save_download_meta(data_type, meta)
+
+            # clean up older files of the same kind now that the new one is known good
+            self._cleanup_old_bulk_files(data_type, output_path)
+
             logger.info(f"Bulk data downloaded and saved to {output_path}")
             return output_path
         
         except Exception as e:
             logger.error(f"Error downloading bulk data: {e}")
             return None
+
+    def _archive_bulk_file(self, bulk_data_path: Path, bulk_info: Dict) -> bool:
+        """
+        Add a downloaded bulk file to the delta-encoded snapshot archive for its type.
+        
+        Args:
+            bulk_data_path: Path to the cached bulk data file
+            bulk_info: Dict with bulk data info from _get_latest_bulk_data_info()
+            
+        Returns:
+            bool: True if the file is in the archive
+        """
+        data_type = bulk_info.get('type', 'default_cards')
+        try:
+            archive = BulkSnapshotArchive(self.archive_dir / data_type, self.generate_card_key)
+            return archive.archive(bulk_data_path, bulk_info.get('updated_at', ''))
+        except Exception as e:
+            logger.warning(f"Could not archive bulk file {bulk_data_path.name}, continuing without it: {e}")
+            return False
+
+    @staticmethod
+    def _parse_content_range_total(content_range: Optional[str]) -> Optional[int]:
+        """Get the complete length from a `Content-Range: bytes start-end/total` header."""
+        if not content_range or '/' not in content_range:
+            return None
+        total = content_range.rsplit('/', 1)[1].strip()
+        return int(total) if total.isdigit() else None
     
-    def _cleanup_old_bulk_files(self, data_type: str, new_file_path: Path) -> None:
+    def _cleanup_old_bulk_files(self, data_type: str, new_file_path: Path, keep_count: int = BULK_CACHE_KEEP_COUNT) -> None:
         """
-        Cleans up older bulk data files of the same type to save disk space.
+        Cleans up older bulk data files of the same type to save disk space. The newest
+        `keep_count` complete files (including the new one) are kept as compressed history;
+        older files, leftover partial downloads and the shard partitions of older files
+        are deleted.
         
         Args:
             data_type: Type of bulk data (e.g., "default_cards")
             new_file_path: Path to the newly downloaded file (which should be kept)
+            keep_count: Number of complete bulk files of this type to keep
         """
         try:
-            # Find all existing files of the same type
-            pattern = f"{data_type}-*.json"
-            existing_files = list(self.cache_dir.glob(pattern))
+            # Find all existing files of the same type, including leftover partial downloads
+            pattern = f"{data_type}-*.json*"
+            new_file_stem = new_file_path.name.split(".json")[0]
+            existing_files = [
+                file_path for file_path in self.cache_dir.glob(pattern)
+                if file_path.name.split(".json")[0] != new_file_stem
+            ]
+
+            # Timestamps in the filenames sort chronologically, so keep the newest complete files
+            complete_files = sorted(
+                (file_path for file_path in existing_files if not file_path.name.endswith(".part")),
+                key=lambda file_path: file_path.name,
+                reverse=True
+            )
+            kept_files = set(complete_files[:max(keep_count - 1, 0)])
+            existing_files = [file_path for file_path in existing_files if file_path not in kept_files]
+
+            self._cleanup_old_partitions(data_type, new_file_stem)
             
-            # Skip if there are no existing files or only the new file
-            if not existing_files or (len(existing_files) == 1 and existing_files[0] == new_file_path):
+            # Skip if there is nothing beyond the files we're keeping
+            if not existing_files:
                 return
                 
             # Log what we found
@@ -181,17 +663,16 @@ class DailyPriceUpdater:
             # Keep track of how much space we free
             bytes_freed = 0
             
-            # Delete older files (skip the new file we're just downloading)
+            # Delete older files (the new file and the kept history were excluded above)
             for file_path in existing_files:
-                if file_path != new_file_path:
-                    # Get file size before deleting for our log
-                    try:
-                        file_size = file_path.stat().st_size
-                        file_path.unlink()
-                        bytes_freed += file_size
-                        logger.info(f"Deleted old bulk data file: {file_path.name} ({file_size / (1024*1024):.2f} MB)")
-                    except Exception as e:
-                        logger.warning(f"Failed to delete old bulk data file {file_path.name}: {e}")
+                # Get file size before deleting for our log
+                try:
+                    file_size = file_path.stat().st_size
+                    file_path.unlink()
+                    bytes_freed += file_size
+                    logger.info(f"Deleted old bulk data file: {file_path.name} ({file_size / (1024*1024):.2f} MB)")
+                except Exception as e:
+                    logger.warning(f"Failed to delete old bulk data file {file_path.name}: {e}")
             
             # Log total space saved
             if bytes_freed > 0:
@@ -202,6 +683,27 @@ class DailyPriceUpdater:
             # Continue with the download even if cleanup fails
     
 
+    def _cleanup_old_partitions(self, data_type: str, new_file_stem: str) -> None:
+        """
+        Delete the shard partitions of older bulk files of the same type. Partitions are
+        only removed after a successful sharded ingest, so a failed run would otherwise
+        leave them behind once a newer bulk file replaces the one they were split from.
+        
+        Args:
+            data_type: Type of bulk data (e.g., "default_cards")
+            new_file_stem: Name of the newly downloaded file without its extensions, whose partitions are kept
+        """
+        partitions_root = self.cache_dir / "partitions"
+        if not partitions_root.exists():
+            return
+
+        for partition_dir in partitions_root.glob(f"{data_type}-*"):
+            if partition_dir.name.startswith(f"{new_file_stem}-"):
+                continue
+            shutil.rmtree(partition_dir, ignore_errors=True)
+            logger.info(f"Deleted stale bulk data partitions: {partition_dir.name}")
+
+
     ## DATA EXTRACTION METHODS ##
     
     def is_format_legal(self, card_data: Dict) -> bool:
@@ -219,15 +721,53 @@ class DailyPriceUpdater:
             if digital:
                 return False
             
-            if self.format_name == 'all':
+            if not self.format_mask:
                 return True
                 
-            legalities = card_data.get('legalities', {})
-            format_status = legalities.get(self.format_name, 'not_legal')
-            return format_status in ['legal', 'restricted']
+            return bool(self.compute_legality_mask(card_data) & self.format_mask)
         except Exception as e:
             logger.error(f"Error checking format legality: {e}")
             return False
+
+    @staticmethod
+    def formats_to_mask(formats: Iterable[str]) -> int:
+        """
+        Get the legality bitmask covering a set of formats.
+        
+        Args:
+            formats: Scryfall legality format names, e.g. {"modern", "pioneer"}
+            
+        Returns:
+            int: Mask with the LEGALITY_FORMATS bit of each format set
+            
+        Raises:
+            ValueError: If a format isn't in LEGALITY_FORMATS
+        """
+        mask = 0
+        for format_name in formats:
+            if format_name not in LEGALITY_FORMATS:
+                raise ValueError(f"Unknown format '{format_name}', expected one of {', '.join(LEGALITY_FORMATS)}")
+            mask |= 1 << LEGALITY_FORMATS.index(format_name)
+        return mask
+
+    @staticmethod
+    def compute_legality_mask(card_data: Dict) -> int:
+        """
+        Compute a card's legality bitmask: bit i is set when the card is legal or
+        restricted in LEGALITY_FORMATS[i].
+        
+        Args:
+            card_data: Card data from Scryfall
+            
+        Returns:
+            int: The card's legality bitmask
+        """
+        legalities = card_data.get('legalities') or {}
+        mask = 0
+        for bit, format_name in enumerate(LEGALITY_FORMATS):
+            if legalities.get(format_name) in ('legal', 'restricted'):
+                mask |= 1 << bit
+        return mask
         
     def generate_card_key(self, card_data: Dict) -> str:
         """
@@ -276,13 +816,14 @@ class DailyPriceUpdater:
         return card_key
 
 
-    def extract_price_data(self, card_data: Dict) -> List[Dict]:
+    def extract_price_data(self, card_data: Dict, price_date: Optional[datetime] = None) -> List[Dict]:
         """
         Extract price data from a Scryfall card, creating separate entries
         for each finish type (regular, foil, etched).
         
         Args:
             card_data: Card data from Scryfall
+            price_date: Date to stamp the prices with (default: today), e.g. a bulk file's updated_at when backfilling
             
         Returns:
             List of price entry dictionaries
@@ -292,8 +833,8 @@ class DailyPriceUpdater:
         # get base card key
         base_card_key = self.generate_card_key(card_data)
 
-        # Get today's date
-        today = datetime.now().date()
+        # Get the price date (the run's price date unless given)
+        today = price_date.date() if price_date is not None else self._price_day().date()
         # need datetime for MongoDB Timeseries object
         today_datetime = datetime.combine(today, datetime.min.time())
         
@@ -355,12 +896,53 @@ class DailyPriceUpdater:
         
         return result
     
-    def create_card_data_document(self, card_data: Dict) -> Dict:
+    def compute_content_hash(self, card_data: Dict) -> str:
+        """
+        Compute a stable hash of the non-volatile fields of a Scryfall card, used to
+        tell whether a stored card document needs more than a prices update.
+        
+        Args:
+            card_data: Card data from Scryfall
+            
+        Returns:
+            str: Hex digest of the card's non-volatile content
+        """
+        stable_fields = {k: v for k, v in card_data.items() if k not in self.VOLATILE_CARD_FIELDS}
+        serialized = json.dumps(stable_fields, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+        digest = hashlib.sha1(f"v{self.CONTENT_HASH_VERSION}:".encode('utf-8'))
+        digest.update(serialized.encode('utf-8'))
+        return digest.hexdigest()
+
+    def compute_price_sort_keys(self, card_data: Dict) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Get the lowest and highest USD price of a card across its finishes, stored on the
+        card document so price-sorted searches don't have to convert the price strings.
+        
+        Args:
+            card_data: Card data from Scryfall
+            
+        Returns:
+            Tuple of (lowest_price, highest_price), both None if the card has no USD price
+        """
+        prices = card_data.get('prices') or {}
+        values = []
+        for field in self.SORT_PRICE_FIELDS:
+            try:
+                if prices.get(field) not in (None, 'null'):
+                    values.append(float(prices[field]))
+            except (ValueError, TypeError):
+                continue
+        if not values:
+            return None, None
+        return min(values), max(values)
+
+    def create_card_data_document(self, card_data: Dict, legality_mask: Optional[int] = None) -> Dict:
         """
         Create a card data document for the cards collection.
         
         Args:
             card_data: Card data from Scryfall
+            legality_mask: The card's legality bitmask, if already computed
             
         Returns:
             Dict: Card document for storage
@@ -379,6 +961,15 @@ class DailyPriceUpdater:
         # Add a field to track if this card has historical data from MTGGoldfish
         # This will be updated later when/if we import MTGGoldfish data
         card_document['has_goldfish_history'] = False
+
+        # Format membership as a bitmask over LEGALITY_FORMATS, so format filters are a single bit test
+        card_document['legality_mask'] = legality_mask if legality_mask is not None else self.compute_legality_mask(card_data)
+
+        # Numeric price sort keys (None when the card has no price), kept in step with prices
+        card_document['lowest_price'], card_document['highest_price'] = self.compute_price_sort_keys(card_data)
+
+        # Fingerprint of everything except prices and ranks, so unchanged cards only need a prices update
+        card_document['content_hash'] = self.compute_content_hash(card_data)
         
         return card_document
     
@@ -407,12 +998,13 @@ class DailyPriceUpdater:
             
             # Check if this is the first card from this set, and that it is actually a paper set
             if set_code not in DIGITAL_ONLY_SET_CODES:
-                existing_count = self.db[MONGO_COLLECTIONS["cards"]].count_documents({"set": set_code})
-                if existing_count == 0:
+                if set_code not in self.known_set_codes:
+                    self.known_set_codes.add(set_code)
                     self.changelog_logger.info(f"NEW SET: {set_name} ({set_code}) - First card: {card_name}")
                     self.new_sets.append({
                         'set': set_name,
-                        'code': set_code
+                        'code': set_code,
+                        'first_card': card_name
                     })
                     self.changes_detected += 1
                 else:
@@ -482,6 +1074,7 @@ class DailyPriceUpdater:
         self.changelog_logger.info("\n" + "=" * 80)
         self.changelog_logger.info("UPDATE SUMMARY")
         self.changelog_logger.info("=" * 80)
+        self.changelog_logger.info(f"Formats: {', '.join(sorted(self.formats))}")
         self.changelog_logger.info(f"Total cards processed: {process_count}")
         self.changelog_logger.info(f"Cards included in database: {card_count}")
         self.changelog_logger.info(f"Cards skipped (format filtering): {skipped_count}")
@@ -519,10 +1112,551 @@ class DailyPriceUpdater:
         self.changelog_logger.info("=" * 80 + "\n")
 
 
-    def update_daily_prices(self) -> bool:
+    def _load_known_set_codes(self) -> None:
+        """
+        Load the set codes already in the cards collection into the in-memory
+        registry used by track_significant_changes for NEW SET detection.
+        """
+        self.known_set_codes = {code.lower() for code in self.db[MONGO_COLLECTIONS["cards"]].distinct("set") if code}
+        logger.info(f"Loaded {len(self.known_set_codes)} known set codes")
+
+
+    def _prefetch_existing_cards(self, card_keys: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch the stored versions of a batch of cards with a single `$in` query,
+        projected down to the fields that track_significant_changes compares.
+        
+        Args:
+            card_keys: card_keys of the cards in the current batch
+            
+        Returns:
+            Dict mapping card_key to the existing (projected) card document
+        """
+        if not card_keys:
+            return {}
+        
+        cursor = self.db[MONGO_COLLECTIONS["cards"]].find(
+            {"card_key": {"$in": card_keys}},
+            self.CHANGE_TRACKING_PROJECTION
+        )
+        return {doc["card_key"]: doc for doc in cursor}
+
+
+    def _write_card_operations(self, card_operations: List) -> None:
+        """
+        Execute card upsert operations against the cards collection in batches.
+        
+        Args:
+            card_operations: pymongo UpdateOne operations for the batch
+        """
+        batch_size = 500
+        for j in range(0, len(card_operations), batch_size):
+            batch = card_operations[j:j+batch_size]
+            result = self.db[MONGO_COLLECTIONS["cards"]].bulk_write(batch)
+            logger.info(f"Updated {result.modified_count} cards, inserted {result.upserted_count} new cards")
+
+    def _write_price_documents(self, price_documents: List[Dict]) -> None:
+        """
+        Insert price documents into the card_prices collection in batches.
+        
+        Args:
+            price_documents: Price entries for the batch
+        """
+        batch_size = 1000
+        for j in range(0, len(price_documents), batch_size):
+            batch = price_documents[j:j+batch_size]
+            self.db[MONGO_COLLECTIONS["card_prices"]].insert_many(batch)
+            logger.info(f"Inserted {len(batch)} price records")
+
+    @staticmethod
+    def latest_price_operations(price_documents: List[Dict]) -> List:
+        """
+        Build the card_latest_prices upserts for a set of price points: one document per
+        card_key + finish holding the latest price and date, plus the price and date it
+        replaced. Uses an update pipeline so the previous values come from the stored
+        document in the same write. A rerun for the same date only overwrites the latest
+        price (keeping the previous one), and a point older than the stored one only becomes
+        the previous price if it falls between the stored previous and latest dates, so
+        points for different days can be written in any order (as backfill workers do).
+        
+        Args:
+            price_documents: Price entries, as built by extract_price_data
+            
+        Returns:
+            List of pymongo UpdateOne operations for the card_latest_prices collection
+        """
+        operations = []
+        for price_document in price_documents:
+            price_date = price_document["date"]
+            is_newer_day = {"$lt": [{"$ifNull": ["$date", None]}, price_date]}
+            is_not_older = {"$lte": [{"$ifNull": ["$date", None]}, price_date]}
+            # Older than the latest point, but not older than the previous one
+            is_previous_day = {"$and": [
+                {"$gt": [{"$ifNull": ["$date", None]}, price_date]},
+                {"$lte": [{"$ifNull": ["$previous_date", None]}, price_date]},
+            ]}
+            operations.append(
+                pymongo.UpdateOne(
+                    {"card_key": price_document["card_key"], "finish": price_document["finish"]},
+                    [{"$set": {
+                        "previous_price": {"$cond": [is_newer_day, "$price",
+                                                     {"$cond": [is_previous_day, price_document["price"], "$previous_price"]}]},
+                        "previous_date": {"$cond": [is_newer_day, "$date",
+                                                    {"$cond": [is_previous_day, price_date, "$previous_date"]}]},
+                        "price": {"$cond": [is_not_older, price_document["price"], "$price"]},
+                        "source": {"$cond": [is_not_older, price_document["source"], "$source"]},
+                        "date": {"$cond": [is_not_older, price_date, "$date"]},
+                    }}],
+                    upsert=True
+                )
+            )
+        return operations
+
+    def _write_latest_prices(self, price_documents: List[Dict]) -> None:
+        """
+        Upsert the batch's price points into the card_latest_prices collection in batches.
+        
+        Args:
+            price_documents: Price entries for the batch
+        """
+        latest_operations = self.latest_price_operations(price_documents)
+        batch_size = 500
+        for j in range(0, len(latest_operations), batch_size):
+            batch = latest_operations[j:j+batch_size]
+            self.db[MONGO_COLLECTIONS["card_latest_prices"]].bulk_write(batch, ordered=False)
+
+    def _write_price_stats(self, price_documents: List[Dict], card_documents: List[Dict]) -> None:
+        """
+        Stats stage: roll the card_price_stats of the batch's card_key + finishes forward
+        with the day's prices.
+        
+        Args:
+            price_documents: Price entries for the batch
+            card_documents: Card documents for the batch, for the card fields kept on the stats
+        """
+        stats_count = self.price_stats.update(price_documents, card_documents)
+        logger.info(f"Updated rolling price stats for {stats_count} card finishes")
+
+
+    def _flush_batch(self, card_documents: List[Dict], price_documents: List[Dict]) -> int:
+        """
+        Track changes for a batch of card documents against their stored versions,
+        then write the card upserts, price inserts, latest price upserts and rolling price
+        stats for the batch. The writes go to different collections, so they are run concurrently.
+        
+        Args:
+            card_documents: Card documents built since the last flush
+            price_documents: Price entries extracted since the last flush
+            
+        Returns:
+            int: Number of price points inserted into card_prices
+        """
+        card_operations = []
+        if card_documents:
+            # One round-trip for the whole batch instead of a find_one per card
+            existing_cards = self._prefetch_existing_cards([doc['card_key'] for doc in card_documents])
+
+            unchanged_count = 0
+            for card_document in card_documents:
+                card_key = card_document['card_key']
+                existing_card = existing_cards.get(card_key)
+
+                # Same content as the stored card: nothing to diff, only prices and the timestamp move
+                if existing_card and existing_card.get('content_hash') == card_document['content_hash']:
+                    volatile_fields = {field: card_document[field] for field in self.VOLATILE_CARD_FIELDS if field in card_document}
+                    volatile_fields['updated_at'] = card_document['updated_at']
+                    update = {"$set": volatile_fields}
+                    # Ranks Scryfall dropped since the last update
+                    missing_fields = {field: "" for field in self.VOLATILE_CARD_FIELDS if field not in card_document}
+                    if missing_fields:
+                        update["$unset"] = missing_fields
+                    card_operations.append(
+                        pymongo.UpdateOne(
+                            {"card_key": card_key},
+                            update
+                        )
+                    )
+                    unchanged_count += 1
+                    continue
+
+                try:
+                    self.track_significant_changes(existing_card, card_document)
+                except Exception as e:
+                    logger.error(f"Error tracking changes for card_key {card_key}: {e}")
+
+                card_operations.append(
+                    pymongo.UpdateOne(
+                        {"card_key": card_key},
+                        {"$set": card_document},
+                        upsert=True
+                    )
+                )
+
+            logger.info(f"{unchanged_count}/{len(card_documents)} cards unchanged since last update, sending prices only")
+
+            # Group the batch's printings by oracle card for the end of run rollup
+            for card_document in card_documents:
+                self.oracle_rollup.add_card(card_document)
+
+        # In change-only mode, card_prices only gets the points whose price moved
+        stored_price_documents = self._filter_price_changes(price_documents) if self.price_changes_only else price_documents
+
+        # Execute the card, price, latest price and stats writes side by side
+        write_futures = []
+        if card_operations:
+            write_futures.append(self._write_executor.submit(self._write_card_operations, card_operations))
+        if stored_price_documents:
+            write_futures.append(self._write_executor.submit(self._write_price_documents, stored_price_documents))
+        if price_documents:
+            write_futures.append(self._write_executor.submit(self._write_latest_prices, price_documents))
+            write_futures.append(self._write_executor.submit(self._write_price_stats, price_documents, card_documents))
+        
+        # Surface any write error to the caller
+        for future in write_futures:
+            future.result()
+
+        return len(stored_price_documents)
+
+    ## PRICE CHANGE STORAGE ##
+    def _load_stored_prices(self) -> None:
+        """
+        Load the last stored price of every card_key + finish (of this updater's shard)
+        from card_latest_prices, for change-only price storage. A price already recorded
+        today is compared against the one before it, so a rerun of the day still stores
+        the day's change points.
+        """
+        today = self._price_day()
+        self.stored_prices = {}
+        self.seen_price_keys = set()
+        self.untracked_card_keys = set()
+        projection = {"_id": 0, "card_key": 1, "finish": 1, "price": 1, "date": 1, "previous_price": 1}
+        for latest in self.db[MONGO_COLLECTIONS["card_latest_prices"]].find({}, projection):
+            if self.shard_count > 1 and self._shard_for_key(latest["card_key"]) != self.shard_index:
+                continue
+            # Already recorded today (by an interrupted or earlier run of the day), so not disappeared
+            if latest.get("date") == today:
+                self.seen_price_keys.add((latest["card_key"], latest["finish"]))
+            price = latest.get("previous_price") if latest.get("date") == today else latest.get("price")
+            if price is not None:
+                self.stored_prices[(latest["card_key"], latest["finish"])] = price
+        logger.info(f"Loaded {len(self.stored_prices)} stored prices for change-only price storage{self._shard_label()}")
+
+    def _filter_price_changes(self, price_documents: List[Dict]) -> List[Dict]:
+        """
+        Keep only the price points that differ from the last stored price of their
+        card_key + finish, and remember them as the new stored prices.
+        
+        Args:
+            price_documents: Price entries for the batch
+            
+        Returns:
+            List of the price entries to insert into card_prices
+        """
+        changed = []
+        for price_document in price_documents:
+            key = (price_document["card_key"], price_document["finish"])
+            self.seen_price_keys.add(key)
+            if self.stored_prices.get(key) != price_document["price"]:
+                changed.append(price_document)
+                self.stored_prices[key] = price_document["price"]
+        return changed
+
+    def _write_disappeared_prices(self) -> int:
+        """
+        In change-only mode, store a price of None for every card_key + finish (of this
+        updater's shard) that had a stored price but got none this run, because the card
+        lost that price or dropped out of the bulk file. Without it the last price would
+        be carried forward as if it hadn't changed. The None also goes to card_latest_prices,
+        so the next run doesn't record the same disappearance again.
+
+        Cards excluded by the format filter are left alone, as are cards committed before
+        a resume (a lost price among those is recorded by the next run).
+
+        Returns:
+            int: Number of None price points inserted into card_prices
+        """
+        today = self._price_day()
+        disappeared = [
+            {"card_key": card_key, "date": today, "price": None, "finish": finish, "source": "scryfall"}
+            for (card_key, finish), price in self.stored_prices.items()
+            if price is not None and (card_key, finish) not in self.seen_price_keys and card_key not in self.untracked_card_keys
+        ]
+        if not disappeared:
+            return 0
+
+        self._write_price_documents(disappeared)
+        self._write_latest_prices(disappeared)
+        for price_document in disappeared:
+            self.stored_prices[(price_document["card_key"], price_document["finish"])] = None
+
+        logger.info(f"Recorded {len(disappeared)} prices that disappeared since the last update{self._shard_label()}")
+        return len(disappeared)
+
+
+    ## INGEST PIPELINE STAGES ##
+    def _read_stage(self, cards: Iterable[Dict], out_queue: queue.Queue, stats: "PipelineStageStats", stop_event: threading.Event, resume_offset: int = 0) -> None:
+        """
+        Reader stage: pulls raw cards from the bulk file (or a shard worker's partition
+        of it) and groups them into batches. Each batch is tagged with the offset just
+        past its last card.
+        
+        Args:
+            cards: Iterable of raw Scryfall card dicts (streamed or preloaded)
+            out_queue: Queue feeding the transform stage
+            stats: Throughput stats for this stage
+            stop_event: Set when another stage has failed and the pipeline should stop
+            resume_offset: Number of leading cards already committed by an earlier run, which are skipped
+        """
+        batch = []
+        offset = 0
+        started = time.perf_counter()
+        for card_data in cards:
+            offset += 1
+            if offset <= resume_offset:
+                if self.price_changes_only:
+                    self.untracked_card_keys.add(self.generate_card_key(card_data))
+                continue
+            batch.append(card_data)
+            if len(batch) == self.batch_size:
+                stats.record(len(batch), time.perf_counter() - started)
+                if not _put_unless_stopped(out_queue, (offset, batch), stop_event):
+                    return
+                batch = []
+                started = time.perf_counter()
+
+        if batch:
+            stats.record(len(batch), time.perf_counter() - started)
+            _put_unless_stopped(out_queue, (offset, batch), stop_event)
+
+    def _transform_batch(self, raw_cards: List[Dict]) -> Dict:
+        """
+        Transform stage work for one batch: format filtering, card document creation
+        and price extraction.
+        
+        Args:
+            raw_cards: Raw Scryfall card dicts for the batch
+            
+        Returns:
+            Dict with the batch's card documents, price documents and counters
+        """
+        card_documents = []
+        price_documents = []
+        skipped_count = 0
+
+        for card_data in raw_cards:
+            try:
+                # Check legality in the requested formats (in one pass) if not processing all cards
+                legality_mask = self.compute_legality_mask(card_data)
+                if self.format_mask and not legality_mask & self.format_mask:
+                    skipped_count += 1
+                    # Its stored prices (from runs with other formats) didn't disappear
+                    if self.price_changes_only:
+                        self.untracked_card_keys.add(self.generate_card_key(card_data))
+                    continue
+                
+                # creating the card document
+                card_document = self.create_card_data_document(card_data, legality_mask)
+
+                # check if document is for a digital card, if so we skip it
+                if card_document['digital']:
+                    continue
+
+                # queue the card; change tracking and the upsert happen together in the writer stage
+                card_documents.append(card_document)
+
+                # Extract as much price data as we can for that card and append those values to the price documents list 
+                price_documents.extend(self.extract_price_data(card_data))
+
+            except Exception as e:
+                logger.error(f"Error processing individual card: {e}.")
+                card_key = card_data.get("card_key")
+                if card_key:
+                    logger.error(f"The above error occured while handling card_key {card_key}")
+                else:
+                    logger.error("The above error was unable to be traced to a card_key.")
+                continue
+
+        return {
+            "card_documents": card_documents,
+            "price_documents": price_documents,
+            "process_count": len(raw_cards),
+            "skipped_count": skipped_count,
+        }
+
+    def _transform_stage(self, in_queue: queue.Queue, out_queue: queue.Queue, stats: "PipelineStageStats", stop_event: threading.Event) -> None:
+        """
+        Transform stage: turns raw card batches from the reader into card and price documents.
+        
+        Args:
+            in_queue: Queue fed by the reader stage
+            out_queue: Queue feeding the writer stage
+            stats: Throughput stats for this stage
+            stop_event: Set when another stage has failed and the pipeline should stop
+        """
+        while True:
+            item = _get_unless_stopped(in_queue, stop_event)
+            if item is _PIPELINE_DONE or item is None:
+                return
+
+            offset, raw_cards = item
+            started = time.perf_counter()
+            transformed = self._transform_batch(raw_cards)
+            transformed["offset"] = offset
+            stats.record(len(raw_cards), time.perf_counter() - started)
+
+            if not _put_unless_stopped(out_queue, transformed, stop_event):
+                return
+
+
+    ## INGESTION LEDGER METHODS ##
+    def _ledger_filter(self, bulk_info: Dict) -> Dict:
+        """Ledger key for a Scryfall bulk file: its type plus its `updated_at` timestamp."""
+        return {
+            "bulk_type": bulk_info.get('type', 'default_cards'),
+            "updated_at": bulk_info.get('updated_at'),
+        }
+
+    def is_already_ingested(self, bulk_info: Dict) -> bool:
+        """
+        Check the ingestion ledger for a completed ingest of this bulk file.
+        
+        Args:
+            bulk_info: Dict with bulk data info from _get_latest_bulk_data_info()
+            
+        Returns:
+            bool: True if this bulk file's prices have already been fully committed
+        """
+        entry = self.db[MONGO_COLLECTIONS["ingestion_ledger"]].find_one(
+            {**self._ledger_filter(bulk_info), "status": "complete"},
+            {"_id": 1}
+        )
+        return entry is not None
+
+    def _begin_ingestion(self, bulk_info: Dict) -> None:
+        """
+        Mark a bulk file as in progress in the ingestion ledger and fix the run's price
+        date. Checkpoints left by an interrupted run are kept so it can resume, along with
+        the price date its committed prices were stamped with; otherwise (first run, or a
+        forced rerun of a completed file) any old checkpoints are cleared.
+        
+        Args:
+            bulk_info: Dict with bulk data info from _get_latest_bulk_data_info()
+        """
+        ledger = self.db[MONGO_COLLECTIONS["ingestion_ledger"]]
+        entry = ledger.find_one(self._ledger_filter(bulk_info), {"_id": 0, "status": 1, "price_date": 1})
+        if entry and entry.get("status") == "in_progress":
+            self.price_date = entry.get("price_date") or self._today()
+            ledger.update_one(self._ledger_filter(bulk_info), {"$set": {"price_date": self.price_date}})
+            return
+
+        self.price_date = self._today()
+        ledger.update_one(
+            self._ledger_filter(bulk_info),
+            {
+                "$set": {"status": "in_progress", "started_at": datetime.now(), "price_date": self.price_date},
+                "$unset": {"committed_offset": "", "partition_offsets": "", "shard_offsets": ""},
+            },
+            upsert=True
+        )
+
+    @staticmethod
+    def _today() -> datetime:
+        """Midnight of the current day."""
+        return datetime.combine(datetime.now().date(), datetime.min.time())
+
+    def _price_day(self) -> datetime:
+        """The run's price date (see _begin_ingestion), or today before an ingest has begun."""
+        return self.price_date if self.price_date is not None else self._today()
+
+    def _checkpoint_field(self) -> str:
+        """
+        Ledger field holding this updater's checkpoint; each shard worker has its own,
+        counting cards of its partition rather than of the whole bulk file.
+        """
+        if self.shard_count > 1:
+            return f"partition_offsets.{self.shard_index}of{self.shard_count}"
+        return "committed_offset"
+
+    def _load_checkpoint(self, bulk_info: Dict) -> int:
+        """
+        Get the resume point for an interrupted ingest of this bulk file.
+        
+        Args:
+            bulk_info: Dict with bulk data info from _get_latest_bulk_data_info()
+            
+        Returns:
+            int: Number of leading bulk file cards whose writes are already committed (0 to start over)
+        """
+        checkpoint_field = self._checkpoint_field()
+        entry = self.db[MONGO_COLLECTIONS["ingestion_ledger"]].find_one(
+            self._ledger_filter(bulk_info),
+            {"_id": 0, "status": 1, checkpoint_field: 1}
+        )
+        if not entry or entry.get("status") != "in_progress":
+            return 0
+
+        # Walk down to the (possibly nested) checkpoint field
+        value = entry
+        for part in checkpoint_field.split('.'):
+            value = value.get(part, {}) if isinstance(value, dict) else {}
+        return value if isinstance(value, int) else 0
+
+    def _save_checkpoint(self, bulk_info: Dict, committed_offset: int) -> None:
+        """
+        Record that every card before committed_offset in the bulk file has been written.
+        
+        Args:
+            bulk_info: Dict with bulk data info from _get_latest_bulk_data_info()
+            committed_offset: Bulk file offset just past the last fully flushed batch
+        """
+        self.db[MONGO_COLLECTIONS["ingestion_ledger"]].update_one(
+            self._ledger_filter(bulk_info),
+            {"$set": {
+                "status": "in_progress",
+                self._checkpoint_field(): committed_offset,
+                "checkpointed_at": datetime.now(),
+            }},
+            upsert=True
+        )
+
+    def _record_ingestion(self, bulk_info: Dict, process_count: int, card_count: int, price_count: int) -> None:
+        """
+        Mark a bulk file as fully committed in the ingestion ledger.
+        
+        Args:
+            bulk_info: Dict with bulk data info from _get_latest_bulk_data_info()
+            process_count: Number of cards read from the bulk file
+            card_count: Number of cards written to the cards collection
+            price_count: Number of price points inserted
+        """
+        self.db[MONGO_COLLECTIONS["ingestion_ledger"]].update_one(
+            self._ledger_filter(bulk_info),
+            {"$set": {
+                "status": "complete",
+                "completed_at": datetime.now(),
+                "price_date": self._price_day(),
+                "cards_processed": process_count,
+                "cards_included": card_count,
+                "price_points": price_count,
+            }},
+            upsert=True
+        )
+
+
+    def update_daily_prices(self, bulk_info: Optional[Dict] = None) -> bool:
         """
         Update the daily prices for cards in the database.
         Gets the current price from Scryfall data.
+
+        The bulk file is processed by a three stage pipeline connected by bounded
+        queues: a reader thread that batches raw cards, a transform thread that
+        builds card and price documents, and the writer (this thread) which tracks
+        changes and flushes card upserts and price inserts concurrently. With
+        worker_count > 1 the cards are sharded by card_key across that many
+        processes, each running its own pipeline, and their results are merged here.
+
+        Args:
+            bulk_info: Bulk data info to ingest; fetched from Scryfall if not given
         
         Returns:
             bool: True if successful, False otherwise
@@ -532,130 +1666,349 @@ class DailyPriceUpdater:
             return False
         
         try:
-            bulk_info = self._get_latest_bulk_data_info()
+            if bulk_info is None:
+                bulk_info = self._get_latest_bulk_data_info()
             if not bulk_info:
                 return False
             
             bulk_data_path = self._download_bulk_data(bulk_info)
             if not bulk_data_path:
                 return False
+
+            # Archiving is best-effort: a failure is logged but doesn't block today's prices
+            if self.archive_bulk_data:
+                self._archive_bulk_file(bulk_data_path, bulk_info)
             
             logger.info("Updating daily prices from Scryfall bulk data...")
 
-            # track stats for logging
-            card_count = 0
-            price_count = 0
-            process_count = 0
-            skipped_count = 0
+            # Mark the bulk file as in progress (keeping checkpoints if a previous run died partway)
+            self._begin_ingestion(bulk_info)
 
-            # Card document operations for bulk insert/update
-            card_operations = []
+            if self.worker_count > 1:
+                counts = self._ingest_bulk_file_sharded(bulk_info, bulk_data_path)
+            else:
+                counts = self._ingest_bulk_file(bulk_info, bulk_data_path)
+
+            process_count = counts["process_count"]
+            card_count = counts["card_count"]
+            skipped_count = counts["skipped_count"]
+            price_count = counts["price_count"]
             
-            # Price document operations for bulk insert
-            price_documents = []
+            # Everything for this bulk file is committed, so a rerun can skip it
+            self._record_ingestion(bulk_info, process_count, card_count, price_count)
 
-            # Process the bulk data file
-            with open(bulk_data_path, 'r', encoding='utf-8') as f:
-                cards = json.load(f)
-                total_cards = len(cards)
-                logger.info(f"Loaded {total_cards} cards from bulk data")
-
-                # process the cards
-                for i, card_data in enumerate(cards):
-                    try:
-                        process_count += 1
-
-                        # Check format legality if not processing all cards
-                        if self.format_name != 'all' and not self.is_format_legal(card_data):
-                            skipped_count += 1
-                            continue
-                        
-                        # creating the card document
-                        card_document = self.create_card_data_document(card_data)
-
-                        # check if document is for a digital card, if so we skip it
-                        if card_document['digital']:
-                            continue
-
-                        card_key = card_document['card_key']
-
-                        # Look up existing card for change tracking
-                        existing_card = self.db[MONGO_COLLECTIONS["cards"]].find_one({"card_key": card_key})
-                        
-                        # Track significant changes
-                        self.track_significant_changes(existing_card, card_document)
-
-                        # add card update operation to card_operations
-                        card_operations.append(
-                            pymongo.UpdateOne(
-                                {"card_key": card_key},
-                                {"$set": card_document},
-                                upsert=True
-                            )
-                        )
+            # Rankings, indices and rollups are derived data: a failure is logged but doesn't fail the update
+            self._write_daily_analytics()
+            self._write_oracle_rollup()
 
-                        # Extract as much price data as we can for that card and append those values to the price documents list 
-                        price_entries = self.extract_price_data(card_data)
-                        if price_entries:
-                            price_documents.extend(price_entries)
-                            price_count += len(price_entries)
-                        
-                        card_count += 1
-
-                        # Log progress and execute batches periodically
-                        if (i+1) % 1000 == 0 or (i+1) == total_cards:
-                            logger.info(f"Processed {i + 1}/{total_cards} cards: {card_count} included, {skipped_count} skipped, {price_count} prices, {self.changes_detected} changes")
-
-                            # Execute card update operations in batches
-                            if card_operations:
-                                batch_size = 500
-                                for j in range(0, len(card_operations), batch_size):
-                                    batch = card_operations[j:j+batch_size]
-                                    result = self.db[MONGO_COLLECTIONS["cards"]].bulk_write(batch)
-                                    logger.info(f"Updated {result.modified_count} cards, inserted {result.upserted_count} new cards")
-                                
-                                # Clear the operations list
-                                card_operations = []
-                            
-                            # Execute price insert operations in batches
-                            if price_documents:
-                                batch_size = 1000
-                                for j in range(0, len(price_documents), batch_size):
-                                    batch = price_documents[j:j+batch_size]
-                                    self.db[MONGO_COLLECTIONS["card_prices"]].insert_many(batch)
-                                    logger.info(f"Inserted {len(batch)} price records")
-                                
-                                # Clear the price documents list
-                                price_documents = []
-                    
-                    except Exception as e:
-                        logger.error(f"Error processing individual card: {e}.")
-                        card_key = card_data["card_key"]
-                        if card_key:
-                            logger.error(f"The above error occured while handling card_key {card_key}")
-                        else:
-                            logger.error("The above error was unable to be traced to a card_key.")
-                        continue
-                
-                # Handle any remaining operations
-                if card_operations:
-                    result = self.db[MONGO_COLLECTIONS["cards"]].bulk_write(card_operations)
-                    logger.info(f"Updated {result.modified_count} cards, inserted {result.upserted_count} new cards")
-                
-                if price_documents:
-                    self.db[MONGO_COLLECTIONS["card_prices"]].insert_many(price_documents)
-                    logger.info(f"Inserted {len(price_documents)} price records")
-                
-                # Log summary to the changelog
-                self._log_update_summary(process_count, card_count, skipped_count, price_count)
-                
-                logger.info(f"Daily price update completed: processed {process_count} cards total, included {card_count}, skipped {skipped_count}, inserted {price_count} prices")
-                return True
+            # Log summary to the changelog
+            self._log_update_summary(process_count, card_count, skipped_count, price_count)
+            
+            logger.info(f"Daily price update completed: processed {process_count} cards total, included {card_count}, skipped {skipped_count}, inserted {price_count} prices")
+            return True
 
 
         except Exception as e:
             logger.error(f"Error updating daily prices: {e}")
             return False
+
+    def _write_daily_analytics(self) -> None:
+        """
+        Build today's top movers rankings and set/format price indices in one pass over
+        the rolling price stats (covering every shard, and batches committed before a resume).
+        """
+        try:
+            price_date = self._price_day()
+            written = build_daily_analytics(self.db, price_date, [TopMoversBuilder(), PriceIndexBuilder()])
+            logger.info(f"Wrote {written['TopMoversBuilder']} top movers rankings and {written['PriceIndexBuilder']} price index points for {price_date.date()}")
+        except Exception as e:
+            logger.error(f"Error building daily price analytics: {e}")
+
+    def _write_oracle_rollup(self) -> None:
+        """Write the cheapest/most expensive printing per oracle_id collected during the run."""
+        try:
+            document_count = self.oracle_rollup.write(self.db)
+            logger.info(f"Wrote oracle rollups for {document_count} cards")
+        except Exception as e:
+            logger.error(f"Error writing oracle rollup: {e}")
+
+    def _seed_oracle_rollup(self) -> None:
+        """
+        On a resumed ingest, batches committed by the interrupted run won't pass through
+        the writer again, so collect their printings from the cards collection instead
+        (only this updater's shard in a shard worker).
+        """
+        projection = {"_id": 0, "card_key": 1, "oracle_id": 1, "card_faces.oracle_id": 1, "name": 1, "set": 1, "prices": 1}
+        for card_document in self.db[MONGO_COLLECTIONS["cards"]].find({}, projection):
+            if self.shard_count > 1 and self._shard_for_key(card_document["card_key"]) != self.shard_index:
+                continue
+            self.oracle_rollup.add_card(card_document)
+
+    def _ingest_bulk_file(self, bulk_info: Dict, bulk_data_path: Path, cards: Optional[Iterable[Dict]] = None) -> Dict:
+        """
+        Run the reader/transform/writer pipeline over a bulk file (or, in a worker
+        process, over this updater's shard of it).
+
+        Args:
+            bulk_info: Dict with bulk data info from _get_latest_bulk_data_info()
+            bulk_data_path: Path to the cached bulk data file (a shard worker's partition file)
+            cards: Cards to ingest instead of reading bulk_data_path, e.g. a decoded partition
+
+        Returns:
+            Dict with process_count, card_count, skipped_count and price_count
+
+        Raises:
+            Exception: Any error from a pipeline stage, after the pipeline has stopped
+        """
+        # Load existing set codes once so new sets are detected without a count query per card
+        self._load_known_set_codes()
+
+        # Pick up after the last committed batch if an earlier run on this file died partway
+        resume_offset = self._load_checkpoint(bulk_info)
+        if self.price_changes_only:
+            self._load_stored_prices()
+
+        self.oracle_rollup = OracleRollupBuilder()
+        if resume_offset:
+            logger.info(f"Resuming bulk data ingest{self._shard_label()} after the first {resume_offset} cards, which were already committed")
+            self._seed_oracle_rollup()
+
+        # track stats for logging
+        card_count = 0
+        price_count = 0
+        process_count = 0
+        skipped_count = 0
+
+        # Process the bulk data file, either streamed card by card or loaded whole
+        if cards is not None:
+            total_cards = None
+            logger.info(f"Streaming cards from {bulk_data_path}{self._shard_label()}")
+        elif self.stream_bulk_data:
+            cards = iter_bulk_cards(bulk_data_path)
+            total_cards = None
+            logger.info(f"Streaming cards from bulk data file {bulk_data_path}{self._shard_label()}")
+        else:
+            with open_bulk_file(bulk_data_path, 'rt') as f:
+                cards = json.load(f)
+            total_cards = len(cards)
+            logger.info(f"Loaded {total_cards} cards from bulk data{self._shard_label()}")
+
+        # Bounded queues between stages provide backpressure, so at most
+        # (read_queue_size + write_queue_size + 3) batches are in memory at once
+        read_queue = queue.Queue(maxsize=self.read_queue_size)
+        write_queue = queue.Queue(maxsize=self.write_queue_size)
+        stop_event = threading.Event()
+
+        read_stats = PipelineStageStats("read")
+        transform_stats = PipelineStageStats("transform")
+        write_stats = PipelineStageStats("write")
+
+        reader = _PipelineThread(
+            name="bulk-reader", target=self._read_stage,
+            args=(cards, read_queue, read_stats, stop_event, resume_offset), done_queue=read_queue, stop_event=stop_event
+        )
+        transformer = _PipelineThread(
+            name="bulk-transform", target=self._transform_stage,
+            args=(read_queue, write_queue, transform_stats, stop_event), done_queue=write_queue, stop_event=stop_event
+        )
+
+        self.price_stats = PriceStatsUpdater(self.db)
+        self._write_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bulk-writer")
+        try:
+            reader.start()
+            transformer.start()
+
+            # Writer stage: runs on this thread so change tracking state stays single-threaded
+            while True:
+                batch = _get_unless_stopped(write_queue, stop_event)
+                if batch is _PIPELINE_DONE or batch is None:
+                    break
+
+                started = time.perf_counter()
+                # Track changes and write the batch
+                stored_price_count = self._flush_batch(batch["card_documents"], batch["price_documents"])
+                write_stats.record(batch["process_count"], time.perf_counter() - started)
+
+                # The batch is fully written, so a crash from here on resumes after it
+                self._save_checkpoint(bulk_info, batch["offset"])
+
+                process_count += batch["process_count"]
+                skipped_count += batch["skipped_count"]
+                card_count += len(batch["card_documents"])
+                price_count += stored_price_count
+
+                progress = f"{batch['offset']}/{total_cards}" if total_cards is not None else f"{batch['offset']}"
+                logger.info(f"Processed {progress} cards{self._shard_label()}: {card_count} included, {skipped_count} skipped, {price_count} prices, {self.changes_detected} changes")
+        except Exception:
+            stop_event.set()
+            raise
+        finally:
+            reader.join()
+            transformer.join()
+            self._write_executor.shutdown(wait=True)
+            self._write_executor = None
+
+        # An upstream stage failing ends the pipeline early, which must not look like success
+        for stage in (reader, transformer):
+            if stage.error is not None:
+                raise stage.error
+
+        for stats in (read_stats, transform_stats, write_stats):
+            logger.info(stats.summary() + self._shard_label())
+
+        # Only once every card has been seen can a missing price count as disappeared
+        if self.price_changes_only:
+            price_count += self._write_disappeared_prices()
+
+        return {
+            "process_count": process_count,
+            "card_count": card_count,
+            "skipped_count": skipped_count,
+            "price_count": price_count,
+        }
+
+    ## MULTI-PROCESS INGEST ##
+    def _shard_label(self) -> str:
+        """Suffix for log lines identifying this updater's shard, if it is a shard worker."""
+        return f" [shard {self.shard_index + 1}/{self.shard_count}]" if self.shard_count > 1 else ""
+
+    def _shard_for(self, card_data: Dict, shard_count: Optional[int] = None) -> int:
+        """Shard a Scryfall card belongs to, out of shard_count (default: this updater's shard_count)."""
+        return self._shard_for_key(self.generate_card_key(card_data), shard_count)
+
+    def _shard_for_key(self, card_key: str, shard_count: Optional[int] = None) -> int:
+        """
+        Shard a card_key belongs to. Uses crc32 rather than hash(), which is salted
+        per process and would send a card to different shards in different workers.
+        """
+        return zlib.crc32(card_key.encode('utf-8')) % (shard_count or self.shard_count)
+
+    def _partition_dir(self, bulk_data_path: Path) -> Path:
+        """Directory holding the per-shard partitions of a bulk file (outside the cleanup glob of the cache)."""
+        return self.cache_dir / "partitions" / f"{bulk_data_path.name.split('.json')[0]}-{self.worker_count}shards"
+
+    def _partition_bulk_file(self, bulk_data_path: Path) -> List[Path]:
+        """
+        Split a bulk file into one JSON lines file per shard in a single pass, so the bulk
+        file is decoded once here and each worker only decodes its own cards again (rather
+        than every worker decoding the whole file and dropping the other shards' cards).
+        Each card's JSON is copied as it appears in the bulk file, in file order, and the
+        partitions are compressed like the cached bulk files.
+
+        Partitions left by an interrupted run are reused: they are rebuilt identically
+        anyway, and the workers' checkpoints count cards of their partition.
+
+        Args:
+            bulk_data_path: Path to the cached bulk data file
+
+        Returns:
+            List of partition file paths, indexed by shard
+        """
+        partition_dir = self._partition_dir(bulk_data_path)
+        suffix = compressed_bulk_suffix()
+        partition_paths = [partition_dir / f"shard-{shard_index}.jsonl{suffix}" for shard_index in range(self.worker_count)]
+        if all(path.exists() for path in partition_paths):
+            logger.info(f"Reusing bulk data partitions in {partition_dir}")
+            return partition_paths
+
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        # Temporary names keep the compression suffix, which open_bulk_file goes by
+        tmp_paths = [path.with_name(f"tmp-{path.name}") for path in partition_paths]
+        started = time.perf_counter()
+        card_count = 0
+
+        partition_files = [open_bulk_file(path, 'wt') for path in tmp_paths]
+        try:
+            for card_data, card_json in iter_bulk_cards(bulk_data_path, with_text=True):
+                # One card per line; re-encode the rare card spread over several lines
+                if '\n' in card_json:
+                    card_json = json.dumps(card_data, ensure_ascii=False)
+                partition_files[self._shard_for(card_data, self.worker_count)].write(card_json + "\n")
+                card_count += 1
+        finally:
+            for f in partition_files:
+                f.close()
+
+        # Only complete partitions get their final names
+        for tmp_path, path in zip(tmp_paths, partition_paths):
+            tmp_path.replace(path)
+
+        logger.info(f"Partitioned {card_count} cards into {self.worker_count} shards in {time.perf_counter() - started:.1f}s")
+        return partition_paths
+
+    def _worker_kwargs(self) -> Dict:
+        """Constructor arguments for the shard worker updaters."""
+        return {
+            "mongo_uri": self.mongo_uri,
+            "db_name": self.db_name,
+            "format_name": self.format_name,
+            "formats": sorted(self.formats),
+            "stream_bulk_data": self.stream_bulk_data,
+            "batch_size": self.batch_size,
+            "read_queue_size": self.read_queue_size,
+            "write_queue_size": self.write_queue_size,
+            "price_changes_only": self.price_changes_only,
+        }
+
+    def _ingest_bulk_file_sharded(self, bulk_info: Dict, bulk_data_path: Path) -> Dict:
+        """
+        Ingest a bulk file with worker_count processes, each owning the cards whose
+        card_key hashes to its shard, with its own MongoClient and pipeline. Their
+        stats and change tracking results are merged into this updater so the
+        changelog summary reads as if it came from a single run.
+
+        The bulk file is first partitioned by shard here (one decode of the whole file),
+        and each worker decodes only its own partition. That first pass runs in this
+        process alone, so it bounds the speedup the workers can give.
+
+        Args:
+            bulk_info: Dict with bulk data info from _get_latest_bulk_data_info()
+            bulk_data_path: Path to the cached bulk data file
+
+        Returns:
+            Dict with the summed process_count, card_count, skipped_count and price_count
+        """
+        partition_paths = self._partition_bulk_file(bulk_data_path)
+        logger.info(f"Ingesting bulk data with {self.worker_count} worker processes")
+
+        with ProcessPoolExecutor(max_workers=self.worker_count) as executor:
+            futures = [
+                executor.submit(_run_ingest_shard, self._worker_kwargs(), bulk_info, str(partition_path), shard_index, self.worker_count, self._price_day())
+                for shard_index, partition_path in enumerate(partition_paths)
+            ]
+            # Raises the first worker error, failing the update (completed shards keep their
+            # checkpoints, and the partitions are kept for the resumed run)
+            results = [future.result() for future in futures]
+
+        shutil.rmtree(self._partition_dir(bulk_data_path), ignore_errors=True)
+
+        counts = {"process_count": 0, "card_count": 0, "skipped_count": 0, "price_count": 0}
+        announced_set_codes = {new_set['code'] for new_set in self.new_sets}
+        for result in results:
+            for key in counts:
+                counts[key] += result["counts"][key]
+
+            # A new set usually spans several shards and each of them saw it as new;
+            # keep the first announcement and log the others as ordinary new cards
+            replaced_lines = {}
+            for new_set in result["new_sets"]:
+                if new_set['code'] in announced_set_codes:
+                    replaced_lines[f"NEW SET: {new_set['set']} ({new_set['code']}) - First card: {new_set['first_card']}"] = \
+                        f"New card added: {new_set['first_card']} ({new_set['code']})"
+                    result["changes_detected"] -= 1
+                else:
+                    announced_set_codes.add(new_set['code'])
+                    self.new_sets.append(new_set)
+
+            for line in result["changelog_lines"]:
+                self.changelog_logger.info(replaced_lines.get(line, line))
+
+            self.changes_detected += result["changes_detected"]
+            self.ban_restricted_changes.extend(result["ban_restricted_changes"])
+            self.errata_changes.extend(result["errata_changes"])
+            self.oracle_rollup.merge(result["oracle_rollup"])
+
+        return counts
         
     def _get_latest_changelog(self):
         """Get the path to the most recent changelog file."""
@@ -683,9 +2036,13 @@ class DailyPriceUpdater:
 
 
 
-    def run(self) -> bool:
+    def run(self, force: bool = False) -> bool:
         """
-        Run the daily price update process.
+        Run the daily price update process. Returns immediately if the latest bulk
+        file has already been ingested, so this is cheap to call repeatedly.
+
+        Args:
+            force: Reprocess the latest bulk file even if the ledger says it was ingested
         
         Returns:
             bool: True if successful, False otherwise
@@ -696,12 +2053,23 @@ class DailyPriceUpdater:
 
             if self.db is None:
                 return False
+
+            bulk_info = self._get_latest_bulk_data_info()
+            if not bulk_info:
+                self.close_connection()
+                return False
+
+            # Nothing new from Scryfall since the last committed ingest
+            if not force and self.is_already_ingested(bulk_info):
+                logger.info(f"Bulk data updated at {bulk_info.get('updated_at')} was already ingested, nothing to do")
+                self.close_connection()
+                return True
             
             # Set up changelog logger
             self.setup_changelog_logger()
             
             # Update daily prices (this now includes change tracking)
-            success = self.update_daily_prices()
+            success = self.update_daily_prices(bulk_info)
             
             # Close database connection
             self.close_connection()
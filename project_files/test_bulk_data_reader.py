@@ -0,0 +1,61 @@
+"""
+Tests for bulk_data_reader.iter_json_array: every read chunk size must decode a bulk
+file exactly like json.loads, including scalars and strings split across two chunks.
+
+Run from project_files with:
+    python -m unittest test_bulk_data_reader
+"""
+import io
+import json
+import unittest
+
+from bulk_data_reader import iter_json_array
+
+
+SAMPLE_JSON = json.dumps([
+    {"id": "a1", "name": "Séance", "prices": {"usd": "12.50", "usd_foil": None}, "edhrec_rank": 12345},
+    12345,
+    -1.5e-3,
+    1.25,
+    "a string, with ] and , inside",
+    True,
+    None,
+    [1, [2, 3], {"nested": "[]"}],
+    {},
+    [],
+    98765.4321,
+], indent=1)
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def decode(self, text, chunk_size):
+        return list(iter_json_array(io.StringIO(text), read_chunk_size=chunk_size))
+
+    def test_every_chunk_size_matches_json_loads(self):
+        expected = json.loads(SAMPLE_JSON)
+        for chunk_size in range(1, len(SAMPLE_JSON) + 2):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.decode(SAMPLE_JSON, chunk_size), expected)
+
+    def test_compact_array_of_numbers(self):
+        # No whitespace after the elements, so every split lands right inside a number
+        text = json.dumps([12345, 1.5, 67890, 2e10, 0.125], separators=(',', ':'))
+        for chunk_size in range(1, len(text) + 2):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.decode(text, chunk_size), json.loads(text))
+
+    def test_source_text_round_trips(self):
+        for chunk_size in (1, 7, 64, 1 << 20):
+            with self.subTest(chunk_size=chunk_size):
+                pairs = list(iter_json_array(io.StringIO(SAMPLE_JSON), read_chunk_size=chunk_size, with_text=True))
+                self.assertEqual([json.loads(text) for _, text in pairs], json.loads(SAMPLE_JSON))
+
+    def test_truncated_array_raises(self):
+        for chunk_size in (1, 5, 1 << 20):
+            with self.subTest(chunk_size=chunk_size):
+                with self.assertRaises(ValueError):
+                    self.decode(SAMPLE_JSON[:-10], chunk_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
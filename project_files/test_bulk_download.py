@@ -0,0 +1,171 @@
+"""
+Tests for DailyPriceUpdater._download_bulk_data against a local HTTP stand-in for
+Scryfall's bulk data host: gzip transfer, interrupted download and resume, cached
+file validation, conditional requests and corrupted cache files.
+
+Run from project_files with:
+    python -m unittest test_bulk_download
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+import gzip
+import json
+import tempfile
+import threading
+import unittest
+
+import scryfall_daily_updater
+from scryfall_daily_updater import DailyPriceUpdater
+
+
+BULK_JSON = json.dumps([{"id": str(i), "name": f"Card {i}", "prices": {"usd": "1.00"}} for i in range(2000)]).encode('utf-8')
+
+
+class BulkFileHandler(BaseHTTPRequestHandler):
+    """
+    Serves the server's `body` gzip-encoded with an ETag, honouring Range/If-Range and
+    If-None-Match. When the server's `truncate_next` is set, the next response stops
+    halfway through its body, like a dropped connection.
+    """
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+
+        if self.headers.get('If-None-Match') == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = server.encoded_body
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range', server.etag) == server.etag:
+            start = int(range_header.split('=')[1].rstrip('-'))
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('ETag', server.etag)
+        self.send_header('Content-Length', str(len(body) - start))
+        self.end_headers()
+
+        if server.truncate_next:
+            server.truncate_next = False
+            self.wfile.write(body[start:start + (len(body) - start) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body[start:])
+
+    def log_message(self, format, *args):
+        return
+
+
+class DownloadBulkDataTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), BulkFileHandler)
+        self.server.requests = []
+        self.server.truncate_next = False
+        self.set_body(BULK_JSON, '"v1"')
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.updater = DailyPriceUpdater()
+        self.updater.cache_dir = Path(self.cache_dir.name)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.updater.session.close()
+        self.cache_dir.cleanup()
+
+    def set_body(self, body, etag):
+        self.server.encoded_body = gzip.compress(body)
+        self.server.etag = etag
+
+    def bulk_info(self, updated_at, uri_stamp=None, size=len(BULK_JSON)):
+        port = self.server.server_address[1]
+        return {
+            'type': 'default_cards',
+            'updated_at': updated_at,
+            'size': size,
+            'download_uri': f"http://127.0.0.1:{port}/default-cards-{uri_stamp or updated_at}.json",
+        }
+
+    def read_cached(self, path):
+        with scryfall_daily_updater.open_bulk_file(path, 'rb') as f:
+            return f.read()
+
+    def test_download_is_validated_and_cached(self):
+        path = self.updater._download_bulk_data(self.bulk_info('2025-01-01T10:00:00+00:00'))
+        self.assertIsNotNone(path)
+        self.assertEqual(self.read_cached(path), BULK_JSON)
+
+        meta = self.updater._load_download_meta('default_cards')
+        self.assertTrue(meta['complete'])
+        self.assertEqual(meta['validated'][str(path)]['decompressed_size'], len(BULK_JSON))
+
+    def test_cache_hit_does_not_reread_validated_file(self):
+        info = self.bulk_info('2025-01-01T10:00:00+00:00')
+        path = self.updater._download_bulk_data(info)
+
+        with mock.patch.object(scryfall_daily_updater, 'open_bulk_file', side_effect=AssertionError("file was re-read")):
+            self.assertEqual(self.updater._download_bulk_data(info), path)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_interrupted_download_resumes_with_range(self):
+        info = self.bulk_info('2025-01-01T10:00:00+00:00')
+        self.server.truncate_next = True
+        self.assertIsNone(self.updater._download_bulk_data(info))
+
+        path = self.updater._download_bulk_data(info)
+        self.assertIsNotNone(path)
+        self.assertEqual(self.read_cached(path), BULK_JSON)
+
+        resume_request = self.server.requests[-1]
+        self.assertTrue(resume_request['Range'].startswith('bytes='))
+        self.assertEqual(resume_request['If-Range'], '"v1"')
+
+    def test_resume_restarts_when_file_changed(self):
+        info = self.bulk_info('2025-01-01T10:00:00+00:00')
+        self.server.truncate_next = True
+        self.assertIsNone(self.updater._download_bulk_data(info))
+
+        changed = BULK_JSON.replace(b'Card 1"', b'Card X"')
+        self.set_body(changed, '"v2"')
+        path = self.updater._download_bulk_data(self.bulk_info('2025-01-01T10:00:00+00:00', size=len(changed)))
+        self.assertEqual(self.read_cached(path), changed)
+
+    def test_conditional_request_only_for_same_uri(self):
+        self.updater._download_bulk_data(self.bulk_info('2025-01-01T10:00:00+00:00'))
+
+        # New timestamped URI: the stored ETag belongs to another URL, so no conditional headers
+        self.set_body(BULK_JSON, '"v2"')
+        new_path = self.updater._download_bulk_data(self.bulk_info('2025-01-02T10:00:00+00:00'))
+        self.assertNotIn('If-None-Match', self.server.requests[-1])
+        self.assertEqual(self.read_cached(new_path), BULK_JSON)
+
+        # Same URI with a new updated_at: an unchanged file comes back as a 304
+        info = self.bulk_info('2025-01-03T10:00:00+00:00', uri_stamp='2025-01-02T10:00:00+00:00')
+        with mock.patch.object(scryfall_daily_updater, 'open_bulk_file', side_effect=AssertionError("file was re-read")):
+            self.assertEqual(self.updater._download_bulk_data(info), new_path)
+        self.assertEqual(self.server.requests[-1]['If-None-Match'], '"v2"')
+
+    def test_corrupted_cache_file_is_downloaded_again(self):
+        info = self.bulk_info('2025-01-01T10:00:00+00:00')
+        path = self.updater._download_bulk_data(info)
+
+        with open(path, 'r+b') as f:
+            f.truncate(path.stat().st_size // 2)
+
+        path = self.updater._download_bulk_data(info)
+        self.assertIsNotNone(path)
+        self.assertEqual(self.read_cached(path), BULK_JSON)
+        self.assertEqual(len(self.server.requests), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()